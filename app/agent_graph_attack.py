@@ -1,13 +1,20 @@
 # app/agent_graph_attack.py
 from __future__ import annotations
 
-from typing import Optional
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage
+import json
+import operator
+from functools import lru_cache
+import orjson
+from typing import Annotated, Any, Dict, List, Optional, Tuple, TypedDict
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
 from langgraph.graph import StateGraph, END, MessagesState
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
 from langgraph.prebuilt import ToolNode, tools_condition
+from langgraph.types import Send
+from openai import RateLimitError
 
-from app.tools.agent_tools import build_tools
+from app.llm import get_llm, note_rate_limit, wait_for_cooldown
+from app.tools.agent_tools import build_tools_by_name
 
 
 SYSTEM_PROMPT_ATTACK = """\
@@ -22,10 +29,11 @@ SYSTEM_PROMPT_ATTACK = """\
 1) analyze_conversation_summary(conversation_summary=...)
    → victim_profile, current_scenario, vulnerability_questions 추출
 
-2) 각 vulnerability_question에 대해:
+2) 각 vulnerability_question에 대한 검색은 시스템이 병렬로 자동 수행한다:
    a) generate_search_queries_from_question(question=..., victim_profile=...)
-   b) search_vulnerability_info(search_queries=..., extract_full_content=true) 
-      → 본문까지 추출된 결과 반환
+   b) search_vulnerability_info(search_queries=..., extract_full_content=true)
+   → "[취약점 검색 결과]" 메시지로 본문까지 추출된 전체 결과가 전달된다
+   → 추가 질문으로 더 검색해야 할 때만 위 두 도구를 직접 호출
 
 
 3) generate_attack_techniques(
@@ -48,7 +56,7 @@ SYSTEM_PROMPT_ATTACK = """\
      analysis_data=...
    )
 
-최종 출력:
+최종 출력 (create_attack_enhancement_report 결과로 시스템이 자동 구성):
 {
   "status": "success",
   "report": {...},
@@ -60,45 +68,216 @@ SYSTEM_PROMPT_ATTACK = """\
 - 최소 3개의 수법이 선택될 때까지 계속 시도
 """.strip()
 
+# 공격 강화 에이전트가 쓰는 도구 (순서 고정 → 매 빌드 동일한 도구 스키마)
+_ALLOW_ATTACK: Tuple[str, ...] = (
+    "analyze_conversation_summary",
+    "create_attack_enhancement_report",
+    "filter_and_select_techniques",
+    "generate_attack_techniques",
+    "generate_search_queries_from_question",
+    "search_vulnerability_info",
+  #   "search_and_extract_vulnerability_info",
+)
 
+# LLM에 보내는 최근 대화 메시지 수 (전체 기록은 state에 유지)
+_HISTORY_WINDOW = 20
+
+# 병렬 검색 결과를 에이전트에게 전달하는 메시지의 머리말 (기록 자르기에서 식별용)
+_SEARCH_RESULTS_TAG = "[취약점 검색 결과]"
+
+# 매 턴 새로 만들지 않도록 모듈 로드 시 한 번만 생성
+# (도구 스키마 + 이 메시지가 매 턴 동일한 프리픽스 → OpenAI 프롬프트 캐시 대상. 수정 금지)
+# 고정 id: add_messages가 id 없는 메시지에 uuid를 써넣어 공유 객체를 바꾸지 않도록
+_SYS_MSG_ATTACK = SystemMessage(content=SYSTEM_PROMPT_ATTACK, id="attack-system-prompt")
+
+
+class AttackState(MessagesState):
+    """공격 강화 그래프 상태"""
+    # 병렬 검색 브랜치 결과 (브랜치별 결과를 이어 붙임)
+    vulnerability_info: Annotated[List[Dict[str, Any]], operator.add]
+
+
+class SearchBranchInput(TypedDict):
+    """취약점 질문 1개에 대한 검색 브랜치 입력"""
+    question: str
+    victim_profile: Dict[str, Any]
+
+
+def _loads(text: str) -> Any:
+    """도구 출력 JSON 파싱 (orjson, 실패 시 표준 json으로 재시도)"""
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return json.loads(text)
+
+
+def _dumps(obj: Any) -> str:
+    """orjson 직렬화 (ensure_ascii=False와 동일하게 한글 그대로 출력)"""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _last_tool_messages(state: AttackState) -> List[ToolMessage]:
+    """마지막 tools 단계에서 생성된 ToolMessage 목록"""
+    msgs: List[ToolMessage] = []
+    for m in reversed(state["messages"]):
+        if not isinstance(m, ToolMessage):
+            break
+        msgs.append(m)
+    msgs.reverse()
+    return msgs
+
+
+def _trim_history(messages: List[Any], window: int = _HISTORY_WINDOW) -> List[Any]:
+    """
+    시스템 프롬프트 + 첫 입력 메시지 + 최근 window개만 남김
+
+    - 잘린 구간이 ToolMessage로 시작하면 짝이 되는 tool_calls(AIMessage)까지 거슬러 올라가
+      호출/결과 쌍을 함께 남긴다 (쌍이 깨지면 API 400 오류)
+    - 마지막 검색 결과 메시지(누적 결과 전체 포함)는 창 밖이어도 항상 남긴다
+    """
+    head = 2  # prelude가 넣은 SystemMessage, 사용자 입력
+    if len(messages) <= window + head:
+        return messages
+
+    start = len(messages) - window
+    while start > head and isinstance(messages[start], ToolMessage):
+        start -= 1
+
+    kept = list(messages[:head])
+    for i in range(start - 1, head - 1, -1):
+        if _is_search_results(messages[i]):
+            kept.append(messages[i])
+            break
+    return [*kept, *messages[start:]]
+
+
+def _is_search_results(message: Any) -> bool:
+    content = getattr(message, "content", None)
+    return (
+        isinstance(message, HumanMessage)
+        and isinstance(content, str)
+        and content.startswith(_SEARCH_RESULTS_TAG)
+    )
+
+
+@lru_cache(maxsize=4)
 def build_attack_enhancement_agent_graph(vectordb, model_name: Optional[str] = None):
-    """공격 강화 분석 에이전트"""
-    all_tools = build_tools(vectordb)
-    
-    # 필요한 도구만
-    allow = {
-        "analyze_conversation_summary",
-        "generate_search_queries_from_question",
-        "search_vulnerability_info",
-      #   "search_and_extract_vulnerability_info",
-        "generate_attack_techniques",
-        "filter_and_select_techniques",
-        "create_attack_enhancement_report",
-    }
-    
-    tools = [t for t in all_tools if t.name in allow]
+    """
+    공격 강화 분석 에이전트
+
+    (vectordb, model_name)별로 한 번만 compile해 재사용한다.
+    실행 상태는 호출마다 새 state에 담기므로 컴파일된 그래프는 공유해도 안전하다.
+    """
+    all_tools = build_tools_by_name(vectordb)
+    tools = [all_tools[name] for name in _ALLOW_ATTACK if name in all_tools]
 
     if len(tools) < 6:
         raise RuntimeError(f"Missing tools. Found: {[t.name for t in tools]}")
     
-    llm = ChatOpenAI(
-        model=(model_name or "gpt-4o-mini"),
+    llm = get_llm(
+        model_name or "gpt-4o-mini",
         temperature=0,
         timeout=180,
         max_retries=3,
+        streaming=True,
+        prompt_cache_key="attack-enhancement-v1",
     ).bind_tools(tools)
     
-    def agent_node(state: MessagesState):
-        messages = [SystemMessage(content=SYSTEM_PROMPT_ATTACK)] + state["messages"]
-        resp = llm.invoke(messages)
+    tools_by_name = {t.name: t for t in tools}
+    gen_queries_tool = tools_by_name["generate_search_queries_from_question"]
+    search_tool = tools_by_name["search_vulnerability_info"]
+
+    def prelude(state: AttackState):
+        """그래프 진입 시 시스템 프롬프트를 대화 맨 앞에 한 번만 삽입"""
+        msgs = state["messages"]
+        if msgs and msgs[0].id == _SYS_MSG_ATTACK.id:
+            return {}
+        return {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), _SYS_MSG_ATTACK, *msgs]}
+
+    async def agent_node(state: AttackState):
+        await wait_for_cooldown()
+        try:
+            resp = await llm.ainvoke(_trim_history(state["messages"]))
+        except RateLimitError as e:
+            note_rate_limit(e)
+            raise
         return {"messages": [resp]}
-    
-    graph = StateGraph(MessagesState)
+
+    def route_after_tools(state: AttackState):
+        """
+        tools 다음 경로 결정
+        - 리포트 작성 완료 → LLM 없이 최종 응답 구성
+        - 분석 결과 → 취약점 질문별 검색 브랜치로 fan-out
+        """
+        for m in _last_tool_messages(state):
+            if m.name == "create_attack_enhancement_report":
+                return "finalize_report"
+            if m.name != "analyze_conversation_summary":
+                continue
+            try:
+                analysis = _loads(m.content)
+            except (TypeError, ValueError):
+                break
+            if not isinstance(analysis, dict):
+                break
+            questions = analysis.get("vulnerability_questions") or []
+            victim_profile = analysis.get("victim_profile") or {}
+            if questions:
+                return [
+                    Send("search_branch", {"question": q, "victim_profile": victim_profile})
+                    for q in questions
+                ]
+        return "agent"
+
+    async def search_branch(branch: SearchBranchInput):
+        """질문 1개: 검색어 생성 → 검색/본문 추출 (LLM 에이전트 왕복 없이 직접 호출)"""
+        queries = await gen_queries_tool.ainvoke(
+            {"question": branch["question"], "victim_profile": branch["victim_profile"]}
+        )
+        results = await search_tool.ainvoke(
+            {"search_queries": queries, "extract_full_content": True}
+        )
+        return {"vulnerability_info": results or []}
+
+    def collect_vulnerability_info(state: AttackState):
+        """병렬 검색 결과를 하나의 메시지로 에이전트에게 전달"""
+        info = state.get("vulnerability_info") or []
+        content = f"{_SEARCH_RESULTS_TAG} ({len(info)}건)\n" + _dumps(info)
+        return {"messages": [HumanMessage(content=content)]}
+
+    def finalize_report(state: AttackState):
+        """리포트 도구 결과를 그대로 최종 JSON 응답으로 (LLM 왕복 생략)"""
+        result: Dict[str, Any] = {}
+        for m in _last_tool_messages(state):
+            if m.name == "create_attack_enhancement_report":
+                try:
+                    result = _loads(m.content)
+                except (TypeError, ValueError):
+                    result = {"error": "invalid report output", "raw": m.content}
+                if not isinstance(result, dict):
+                    result = {"error": "invalid report output", "raw": m.content}
+
+        status = "error" if result.get("error") else "success"
+        # 도구 결과에 status가 있어도 여기서 판정한 값을 우선 (status는 맨 앞 유지)
+        final = {"status": status, **{k: v for k, v in result.items() if k != "status"}}
+        return {"messages": [AIMessage(content=_dumps(final))]}
+
+    graph = StateGraph(AttackState)
+    graph.add_node("prelude", prelude)
     graph.add_node("agent", agent_node)
     graph.add_node("tools", ToolNode(tools))
-    
-    graph.set_entry_point("agent")
+    graph.add_node("search_branch", search_branch)
+    graph.add_node("collect_vulnerability_info", collect_vulnerability_info)
+    graph.add_node("finalize_report", finalize_report)
+
+    graph.set_entry_point("prelude")
+    graph.add_edge("prelude", "agent")
     graph.add_conditional_edges("agent", tools_condition, {"tools": "tools", END: END})
-    graph.add_edge("tools", "agent")
-    
-    return graph.compile()
\ No newline at end of file
+    graph.add_conditional_edges(
+        "tools", route_after_tools, ["agent", "search_branch", "finalize_report"]
+    )
+    graph.add_edge("search_branch", "collect_vulnerability_info")
+    graph.add_edge("collect_vulnerability_info", "agent")
+    graph.add_edge("finalize_report", END)
+
+    return graph.compile()
@@ -1,17 +1,24 @@
 # app/agents/research_agent.py
 """
 LangGraph 기반 연구 에이전트
-- 데이터 분석 → 웹 검색 → 기법 생성 → 리포트 작성
+- 데이터 분석 → 웹 검색 → 기법 생성 + 리포트 작성 (LLM 1회)
+- 모든 노드는 async (동기 서비스 호출은 스레드로 위임)
 """
 from __future__ import annotations
 
-import json
+import asyncio
+import hashlib
+import heapq
 import logging
+import re
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, TypedDict
+from functools import lru_cache
+import operator
+from typing import Annotated, Any, Dict, List, Optional, TypedDict
 
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+import orjson
+
+from langchain_core.messages import SystemMessage, HumanMessage
 from langgraph.graph import StateGraph, END
 
 from app.schemas import (
@@ -23,284 +30,408 @@ from app.schemas import (
     GeneratedTechnique,
     SearchResult,
 )
-from app.services.analyzer import DataAnalyzer
-from app.services.searcher import WebSearcher
+from app.services.analyzer import get_analyzer
+from app.services.searcher import get_searcher
 from app.config import SETTINGS
+from app.llm import call_with_timeout_retry, coalesce_call, get_llm
+from app.utils import aparse_llm_json
 
 logger = logging.getLogger(__name__)
 
 
 # ==================== State 정의 ====================
 
+def _merge_dict(left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """metadata 리듀서: 노드가 반환한 키만 덮어씀"""
+    return {**(left or {}), **(right or {})}
+
+
 class ResearchState(TypedDict, total=False):
-    """에이전트 상태"""
+    """
+    에이전트 상태
+
+    노드는 바뀐 필드만 반환하고 병합은 리듀서가 담당한다.
+    (매 노드마다 전체 상태를 복사하지 않음)
+    """
     # 입력
     request: Dict[str, Any]
 
     # 분석 결과
     analysis: Optional[AnalysisSummary]
 
-    # 검색 결과
-    search_results: List[SearchResult]
+    # 검색 결과 (추가분만 반환)
+    search_results: Annotated[List[SearchResult], operator.add]
 
-    # 생성된 기법
-    techniques: List[GeneratedTechnique]
+    # 생성된 기법 (추가분만 반환)
+    techniques: Annotated[List[GeneratedTechnique], operator.add]
 
     # 최종 리포트
     report: Optional[AnalysisReport]
 
-    # 메타데이터
-    metadata: Dict[str, Any]
+    # 메타데이터 (키 단위 병합)
+    metadata: Annotated[Dict[str, Any], _merge_dict]
 
     # 에러
     error: Optional[str]
 
 
+# ==================== 프롬프트 ====================
+# 고정 지시문은 모듈 상수 → 매 요청 바이트 단위로 동일한 프리픽스 (OpenAI 프롬프트 캐시 적중)
+# 요청별 데이터는 뒤쪽 사용자 메시지에만 넣는다.
+
+_REPORT_SYSTEM_PROMPT = """
+당신은 보이스피싱 시뮬레이션 시스템의 공격 수법 생성 및 전략 리포트 작성 전문가입니다.
+대화 분석 결과를 바탕으로 피해자 맞춤형 공격 수법을 생성하고, 시뮬레이션에서 활용할 수 있는 리포트를 작성합니다.
+생성된 수법은 다른 시스템에서 대응책을 마련하는 데 활용됩니다.
+
+사용자 메시지로 대화 분석 요약, 피해자 프로필, 현재 시나리오, 피해자 취약점, 웹 검색 결과가 주어집니다.
+이를 바탕으로 피해자 맞춤형 공격 수법 10개를 생성하고
+그중 fit_score가 높은 수법들을 중심으로 공격 전략 리포트를 작성하세요.
+
+수법 구성 비율 (7:3):
+[대화 기반 수법 7개] - 대화에서 발견된 취약점을 직접 공략:
+- 피해자의 심리 상태(불안, 두려움, 신뢰 등) 활용
+- 대화에서 드러난 약점(권위 복종, 급한 성격, 금융 걱정 등) 공략
+- 시나리오에 맞는 화법과 설득 기법
+- 피해자 특성(연령, 직업)에 맞춘 접근법
+
+[4차 산업 기술 활용 수법 3개] - 첨단 기술로 효과 증폭:
+- AI 딥페이크 음성/영상, QR코드, 악성앱, SNS 사칭 등
+
+다음 JSON 형식으로 출력하세요:
+{
+    "techniques": [
+        {
+            "name": "공격 수법 이름",
+            "description": "수법에 대한 상세 설명",
+            "application": "피해자에게 어떻게 적용하는지 구체적인 대화 예시 포함",
+            "expected_effect": "피해자가 어떤 심리적 반응을 보일지, 왜 효과적인지",
+            "fit_score": 0.85
+        },
+        ...
+    ],
+    "report": {
+        "summary": "피해자 대화 분석 및 공격 전략 핵심 요약 (3-4문장) - 대화에서 발견된 취약점과 효과적인 공략법 중심",
+        "vulnerabilities": [
+            "대화에서 발견된 주요 취약점 1",
+            "공략 가능한 심리적 약점 2",
+            "활용 가능한 상황적 요인 3",
+            ...
+        ],
+        "attack_strategies": [
+            "대화 기반 전략 1: 구체적인 화법과 실행 방법",
+            "대화 기반 전략 2: 피해자 심리 활용법",
+            "대화 기반 전략 3: 시나리오 맞춤 접근법",
+            "기술 활용 전략: 딥페이크/QR코드/악성앱 등 보조 수단",
+            ...
+        ],
+        "implementation_guide": "시뮬레이션에서 수법을 적용하는 순서와 방법 - 대화 흐름에 맞춘 단계별 가이드"
+    }
+}
+
+규칙:
+1. techniques는 정확히 10개 생성 (대화 기반 7개 + 기술 활용 3개)
+2. fit_score는 해당 피해자에게 얼마나 효과적일지 0.0~1.0로 평가
+3. 대화에서 발견된 취약점을 구체적으로 활용
+4. 피해자의 특성(나이, 직업, 심리 상태)에 정확히 맞춤화
+5. 검색 결과에서 얻은 최신 수법 정보 반영
+6. report는 fit_score 0.6 이상인 상위 수법(최대 6개)을 기준으로 작성
+7. JSON만 출력 (마크다운 없이)
+""".strip()
+
+_REPORT_SYS_MSG = SystemMessage(content=_REPORT_SYSTEM_PROMPT)
+
+_REPORT_INPUT_TEMPLATE = """
+[대화 분석 요약]
+{summary}
+
+[피해자 프로필]
+{profile}
+
+[현재 시나리오]
+{scenario}
+
+[대화에서 발견된 피해자 취약점]
+{vulnerabilities}
+
+[웹 검색으로 수집된 관련 정보 ({search_count}건)]
+{search_summary}
+""".strip()
+
+
+# ==================== LLM ====================
+
+# 프롬프트에 넣는 검색 결과 본문 길이
+_PROMPT_CONTENT_CHARS = 400
+
+def _technique_llm():
+    """
+    기법 + 리포트 생성용 LLM (창의성 필요 → temperature 0.7)
+
+    call_with_timeout_retry로 감싸 호출하므로 클라이언트 자체 재시도는 끈다.
+    """
+    return get_llm(
+        SETTINGS.model_name,
+        temperature=0.7,
+        timeout=int(SETTINGS.llm_timeout_cap),
+        max_retries=0,
+        prompt_cache_key="research-report-v1",
+    )
+
+
+def _fit_score_percent(raw: Any) -> int:
+    """LLM의 0.0~1.0 fit_score → 0~100 정수 (범위 밖이면 ValueError)"""
+    ratio = float(raw)
+    if not 0.0 <= ratio <= 1.0:
+        raise ValueError(f"fit_score out of range: {raw!r}")
+    return int(round(ratio * 100))
+
+
+def _to_technique(t: Dict[str, Any]) -> Optional[GeneratedTechnique]:
+    """LLM 출력 dict → GeneratedTechnique (fit_score가 잘못된 항목은 None)"""
+    try:
+        fit_score = _fit_score_percent(t.get("fit_score", 0.5))
+    except (TypeError, ValueError) as e:
+        logger.warning("Skipping technique %r: %s", t.get("name"), e)
+        return None
+    return GeneratedTechnique(
+        name=t.get("name", ""),
+        description=t.get("description", ""),
+        application=t.get("application", ""),
+        expected_effect=t.get("expected_effect", ""),
+        fit_score=fit_score,
+    )
+
+
+def _to_techniques(items: List[Dict[str, Any]]) -> List[GeneratedTechnique]:
+    return [t for t in map(_to_technique, items) if t is not None]
+
+
+# ==================== 스트리밍 파서 ====================
+
+_TECHNIQUES_ARRAY_RE = re.compile(r'"techniques"\s*:\s*\[')
+
+
+class _TechniqueStreamParser:
+    """
+    스트리밍 응답에서 "techniques" 배열 원소를 완성되는 대로 추출
+
+    문자열/이스케이프를 고려해 중괄호 깊이만 추적하므로
+    청크가 들어올 때마다 새로 들어온 부분만 훑는다 (전체 재파싱 없음).
+    """
+
+    def __init__(self):
+        self._scan = ""          # 배열 시작 전 텍스트 (키가 청크 경계에 걸칠 수 있음)
+        self._buf: List[str] = []  # 아직 닫히지 않은 원소 조각
+        self._in_array = False
+        self._done = False
+        self._depth = 0
+        self._in_str = False
+        self._escape = False
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """청크 추가 → 이번에 완성된 원소 dict 목록"""
+        out: List[Dict[str, Any]] = []
+        if self._done:
+            return out
+
+        if not self._in_array:
+            self._scan += text
+            match = _TECHNIQUES_ARRAY_RE.search(self._scan)
+            if not match:
+                self._scan = self._scan[-64:]
+                return out
+            text = self._scan[match.end():]
+            self._scan = ""
+            self._in_array = True
+
+        start = 0 if self._depth > 0 else None
+        for i, ch in enumerate(text):
+            if self._in_str:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_str = False
+            elif ch == '"':
+                self._in_str = True
+            elif ch == "{":
+                if self._depth == 0:
+                    start = i
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._buf.append(text[start:i + 1])
+                    try:
+                        out.append(orjson.loads("".join(self._buf)))
+                    except ValueError:
+                        pass
+                    self._buf.clear()
+                    start = None
+            elif ch == "]" and self._depth == 0:
+                self._done = True
+                break
+
+        if self._depth > 0 and start is not None:
+            self._buf.append(text[start:])
+        return out
+
+
+async def _stream_report(llm, messages: List[Any]):
+    """
+    LLM 응답 스트리밍
+    - 기법은 완성되는 대로 변환 (생성 순서 유지)
+    - 리포트는 스트림이 끝난 뒤 파싱
+
+    Returns:
+        (기법 목록, 리포트 dict)
+    """
+    parser = _TechniqueStreamParser()
+    techniques: List[GeneratedTechnique] = []
+    parts: List[str] = []
+    async for chunk in llm.astream(messages):
+        text = chunk.content
+        if not isinstance(text, str) or not text:
+            continue
+        parts.append(text)
+        techniques.extend(_to_techniques(parser.feed(text)))
+
+    result = await aparse_llm_json("".join(parts))
+    report_data = result.get("report") or {}
+
+    if not techniques:
+        # 스트림에서 배열을 못 찾은 경우 (형식이 다른 응답)
+        techniques = _to_techniques(result.get("techniques", []))
+
+    return techniques, report_data
+
+
+def _fit_score(t: GeneratedTechnique) -> int:
+    return t.fit_score
+
+
+def _select_techniques(techniques: List[GeneratedTechnique]) -> List[GeneratedTechnique]:
+    """
+    리포트에 넣을 상위 기법 선택
+    - fit_score >= 60 (0.6) 중 상위 6개
+    - 3개 미만이면 전체에서 상위 3개
+    (전체 정렬 없이 heapq.nlargest, 동점은 생성 순서)
+    """
+    selected = heapq.nlargest(6, (t for t in techniques if t.fit_score >= 60), key=_fit_score)
+    if len(selected) < 3:
+        selected = heapq.nlargest(3, techniques, key=_fit_score)
+    return selected
+
+
 # ==================== 노드 함수 ====================
 
-def analyze_node(state: ResearchState) -> ResearchState:
+async def analyze_node(state: ResearchState) -> ResearchState:
     """데이터 분석 노드"""
     logger.info("=== Analyze Node ===")
 
     try:
         request = state["request"]
-        analyzer = DataAnalyzer()
+        analyzer = get_analyzer()
 
         # 분석 수행
-        analysis = analyzer.analyze(
+        analysis = await analyzer.analyze_async(
             data=request.get("data", ""),
             analysis_type=request.get("analysis_type"),
             context=request.get("context"),
         )
 
-        logger.info(f"Analysis complete: {len(analysis.search_queries)} queries generated")
+        logger.info("Analysis complete: %s queries generated", len(analysis.search_queries))
 
         return {
-            **state,
             "analysis": analysis,
             "metadata": {
-                **state.get("metadata", {}),
                 "analysis_completed": True,
                 "queries_count": len(analysis.search_queries),
             }
         }
 
     except Exception as e:
-        logger.error(f"Analysis failed: {e}")
-        return {**state, "error": str(e)}
+        logger.error("Analysis failed: %s", e)
+        return {"error": str(e)}
 
 
-def search_node(state: ResearchState) -> ResearchState:
+async def search_node(state: ResearchState) -> ResearchState:
     """웹 검색 노드"""
     logger.info("=== Search Node ===")
 
-    if state.get("error"):
-        return state
-
     try:
-        analysis = state.get("analysis")
-        if not analysis or not analysis.search_queries:
-            logger.warning("No search queries available")
-            return {**state, "search_results": []}
+        analysis = state["analysis"]
 
         # 검색 설정
         request = state["request"]
         search_config = request.get("search_config") or {}
 
-        searcher = WebSearcher(
+        searcher = get_searcher(
             max_results_per_query=search_config.get("max_results_per_query", 3),
             search_depth=search_config.get("search_depth", "basic"),
         )
 
         # 검색 수행
-        results = searcher.search(
+        results = await searcher.asearch(
             queries=analysis.search_queries,
             extract_content=search_config.get("extract_content", True),
             max_total_results=search_config.get("max_total_results", 15),
+            max_concurrency=search_config.get("max_concurrency", 5),
         )
 
-        logger.info(f"Search complete: {len(results)} results")
+        logger.info("Search complete: %s results", len(results))
 
         return {
-            **state,
             "search_results": results,
             "metadata": {
-                **state.get("metadata", {}),
                 "search_completed": True,
                 "results_count": len(results),
             }
         }
 
     except Exception as e:
-        logger.error(f"Search failed: {e}", exc_info=True)
-        return {**state, "search_results": [], "error": str(e)}
-
+        logger.error("Search failed: %s", e, exc_info=True)
+        return {"error": str(e)}
 
-def generate_techniques_node(state: ResearchState) -> ResearchState:
-    """기법 생성 노드"""
-    logger.info("=== Generate Techniques Node ===")
 
-    if state.get("error"):
-        return state
+async def generate_report_node(state: ResearchState) -> ResearchState:
+    """기법 생성 + 리포트 작성 노드 (LLM 1회 호출)"""
+    logger.info("=== Generate Report Node ===")
 
     try:
         analysis = state.get("analysis")
         search_results = state.get("search_results", [])
+        profile = analysis.extracted_profile if analysis else None
 
         if not search_results:
             logger.warning("No search results for technique generation")
-            return {**state, "techniques": []}
-
-        llm = ChatOpenAI(
-            model=SETTINGS.model_name,
-            temperature=0.7,
-            timeout=90,
-        )
-
-        # 검색 결과 정리
-        search_summary = []
-        for i, result in enumerate(search_results[:15], 1):
-            search_summary.append(
-                f"{i}. [{result.query}] ({result.content_type})\n"
-                f"   제목: {result.title}\n"
-                f"   내용: {result.content[:400]}\n"
-            )
-
-        profile_str = ""
-        if analysis and analysis.extracted_profile:
-            p = analysis.extracted_profile
-            profile_str = f"""
-연령대: {p.age_group or '알 수 없음'}
-직업: {p.occupation or '알 수 없음'}
-특징: {', '.join(p.characteristics) if p.characteristics else '없음'}
-"""
-
-        scenario_str = analysis.detected_scenario if analysis else "알 수 없음"
-        vulnerabilities_str = "\n".join(f"- {v}" for v in (analysis.vulnerability_areas if analysis else []))
-
-        prompt = f"""
-당신은 보이스피싱 시뮬레이션 시스템의 공격 수법 생성 전문가입니다.
-대화 분석 결과를 바탕으로 피해자 맞춤형 공격 수법을 생성합니다.
-생성된 수법은 다른 시스템에서 대응책을 마련하는 데 활용됩니다.
-
-[피해자 프로필]
-{profile_str}
-
-[현재 시나리오]
-{scenario_str}
-
-[대화에서 발견된 피해자 취약점]
-{vulnerabilities_str}
-
-[웹 검색으로 수집된 관련 정보 ({len(search_results)}건)]
-{chr(10).join(search_summary)}
-
-위 대화 분석 결과를 바탕으로, 피해자 맞춤형 공격 수법 10개를 생성하세요.
-
-수법 구성 비율 (7:3):
-[대화 기반 수법 7개] - 대화에서 발견된 취약점을 직접 공략:
-- 피해자의 심리 상태(불안, 두려움, 신뢰 등) 활용
-- 대화에서 드러난 약점(권위 복종, 급한 성격, 금융 걱정 등) 공략
-- 시나리오에 맞는 화법과 설득 기법
-- 피해자 특성(연령, 직업)에 맞춘 접근법
-
-[4차 산업 기술 활용 수법 3개] - 첨단 기술로 효과 증폭:
-- AI 딥페이크 음성/영상, QR코드, 악성앱, SNS 사칭 등
-
-다음 JSON 형식으로 정확히 10개의 공격 수법을 출력하세요:
-{{
-    "techniques": [
-        {{
-            "name": "공격 수법 이름",
-            "description": "수법에 대한 상세 설명",
-            "application": "피해자에게 어떻게 적용하는지 구체적인 대화 예시 포함",
-            "expected_effect": "피해자가 어떤 심리적 반응을 보일지, 왜 효과적인지",
-            "fit_score": 0.85
-        }},
-        ...
-    ]
-}}
-
-규칙:
-1. 정확히 10개 생성 (대화 기반 7개 + 기술 활용 3개)
-2. fit_score는 해당 피해자에게 얼마나 효과적일지 0.0~1.0로 평가
-3. 대화에서 발견된 취약점을 구체적으로 활용
-4. 피해자의 특성(나이, 직업, 심리 상태)에 정확히 맞춤화
-5. 검색 결과에서 얻은 최신 수법 정보 반영
-6. JSON만 출력 (마크다운 없이)
-""".strip()
-
-        response = llm.invoke(prompt).content.strip()
-
-        # JSON 파싱
-        if "```json" in response:
-            response = response.split("```json")[1].split("```")[0]
-        elif "```" in response:
-            response = response.split("```")[1].split("```")[0]
-
-        result = json.loads(response.strip())
-        techniques_data = result.get("techniques", [])
-
-        techniques = [
-            GeneratedTechnique(
-                name=t.get("name", ""),
-                description=t.get("description", ""),
-                application=t.get("application", ""),
-                expected_effect=t.get("expected_effect", ""),
-                fit_score=float(t.get("fit_score", 0.5)),
+            report = AnalysisReport(
+                summary=analysis.summary if analysis else "",
+                profile=profile,
+                vulnerabilities=list(analysis.vulnerability_areas) if analysis else [],
             )
-            for t in techniques_data
-        ]
-
-        # 점수순 정렬
-        techniques.sort(key=lambda x: x.fit_score, reverse=True)
-
-        logger.info(f"Generated {len(techniques)} techniques")
-
-        return {
-            **state,
-            "techniques": techniques,
-            "metadata": {
-                **state.get("metadata", {}),
-                "techniques_generated": len(techniques),
+            return {
+                "techniques": [],
+                "report": report,
+                "metadata": {
+                    "techniques_generated": 0,
+                    "report_created": True,
+                    "completed_at": datetime.now(timezone.utc).isoformat(),
+                }
             }
-        }
-
-    except Exception as e:
-        logger.error(f"Technique generation failed: {e}")
-        return {**state, "techniques": [], "error": str(e)}
-
-
-def create_report_node(state: ResearchState) -> ResearchState:
-    """리포트 생성 노드"""
-    logger.info("=== Create Report Node ===")
-
-    if state.get("error"):
-        return state
-
-    try:
-        analysis = state.get("analysis")
-        techniques = state.get("techniques", [])
-
-        # 상위 기법 선택 (fit_score >= 0.6)
-        selected_techniques = [t for t in techniques if t.fit_score >= 0.6][:6]
-
-        if not selected_techniques and techniques:
-            selected_techniques = techniques[:3]
 
-        llm = ChatOpenAI(
-            model=SETTINGS.model_name,
-            temperature=0,
-            timeout=60,
-        )
+        llm = _technique_llm()
 
-        techniques_str = json.dumps(
-            [t.model_dump() for t in selected_techniques],
-            ensure_ascii=False,
-            indent=2,
+        # 검색 결과 정리
+        search_summary = "\n".join(
+            f"{i}. [{r.query}] ({r.content_type})\n"
+            f"   제목: {r.title}\n"
+            f"   내용: {r.content[:_PROMPT_CONTENT_CHARS]}\n"
+            for i, r in enumerate(search_results[:15], 1)
         )
 
-        profile = analysis.extracted_profile if analysis else None
         profile_str = ""
         if profile:
             profile_str = f"""
@@ -309,55 +440,40 @@ def create_report_node(state: ResearchState) -> ResearchState:
 특징: {', '.join(profile.characteristics) if profile.characteristics else '없음'}
 """
 
-        prompt = f"""
-당신은 보이스피싱 시뮬레이션 시스템의 공격 전략 리포트 작성 전문가입니다.
-대화 분석 결과와 생성된 수법을 정리하여 시뮬레이션에서 활용할 수 있는 리포트를 작성하세요.
-
-[대화 분석 요약]
-{analysis.summary if analysis else '없음'}
-
-[피해자 프로필]
-{profile_str}
-
-[생성된 공격 수법 {len(selected_techniques)}개]
-{techniques_str}
-
-다음 JSON 형식으로 출력하세요:
-{{
-    "summary": "피해자 대화 분석 및 공격 전략 핵심 요약 (3-4문장) - 대화에서 발견된 취약점과 효과적인 공략법 중심",
-    "vulnerabilities": [
-        "대화에서 발견된 주요 취약점 1",
-        "공략 가능한 심리적 약점 2",
-        "활용 가능한 상황적 요인 3",
-        ...
-    ],
-    "attack_strategies": [
-        "대화 기반 전략 1: 구체적인 화법과 실행 방법",
-        "대화 기반 전략 2: 피해자 심리 활용법",
-        "대화 기반 전략 3: 시나리오 맞춤 접근법",
-        "기술 활용 전략: 딥페이크/QR코드/악성앱 등 보조 수단",
-        ...
-    ],
-    "implementation_guide": "시뮬레이션에서 수법을 적용하는 순서와 방법 - 대화 흐름에 맞춘 단계별 가이드"
-}}
-
-JSON만 출력하세요.
-""".strip()
+        scenario_str = analysis.detected_scenario if analysis else "알 수 없음"
+        vulnerabilities_str = "\n".join(f"- {v}" for v in (analysis.vulnerability_areas if analysis else []))
 
-        response = llm.invoke(prompt).content.strip()
+        messages = [
+            _REPORT_SYS_MSG,
+            HumanMessage(content=_REPORT_INPUT_TEMPLATE.format(
+                summary=analysis.summary if analysis else "없음",
+                profile=profile_str,
+                scenario=scenario_str,
+                vulnerabilities=vulnerabilities_str,
+                search_count=len(search_results),
+                search_summary=search_summary,
+            )),
+        ]
 
-        if "```json" in response:
-            response = response.split("```json")[1].split("```")[0]
-        elif "```" in response:
-            response = response.split("```")[1].split("```")[0]
+        search_config = state["request"].get("search_config") or {}
+        prompt_key = hashlib.blake2b(
+            messages[-1].content.encode("utf-8"), digest_size=16
+        ).hexdigest()
+        techniques, report_data = await coalesce_call(
+            f"research-report:{prompt_key}",
+            lambda: call_with_timeout_retry(
+                lambda: _stream_report(llm, messages),
+                base_timeout=search_config.get("request_timeout"),
+            ),
+        )
 
-        report_data = json.loads(response.strip())
+        logger.info("Generated %s techniques", len(techniques))
 
         report = AnalysisReport(
             summary=report_data.get("summary", ""),
             profile=profile,
             vulnerabilities=report_data.get("vulnerabilities", []),
-            techniques=selected_techniques,
+            techniques=_select_techniques(techniques),
             recommendations=report_data.get("attack_strategies", []),  # 공격 전략
             implementation_guide=report_data.get("implementation_guide"),
         )
@@ -365,22 +481,40 @@ JSON만 출력하세요.
         logger.info("Report created successfully")
 
         return {
-            **state,
+            "techniques": techniques,
             "report": report,
             "metadata": {
-                **state.get("metadata", {}),
+                "techniques_generated": len(techniques),
                 "report_created": True,
                 "completed_at": datetime.now(timezone.utc).isoformat(),
             }
         }
 
     except Exception as e:
-        logger.error(f"Report creation failed: {e}")
-        return {**state, "error": str(e)}
+        logger.error("Report generation failed: %s", e)
+        return {"error": str(e)}
 
 
 # ==================== 그래프 빌드 ====================
 
+def route_after_analyze(state: ResearchState) -> str:
+    """분석 실패 → 종료, 검색 쿼리 없음 → 검색 생략"""
+    if state.get("error"):
+        return END
+    analysis = state.get("analysis")
+    if not analysis or not analysis.search_queries:
+        logger.warning("No search queries available, skipping search")
+        return "generate_report"
+    return "search"
+
+
+def route_after_search(state: ResearchState) -> str:
+    """검색 실패 → 종료 (결과가 비면 generate_report가 LLM 없이 기본 리포트 작성)"""
+    if state.get("error"):
+        return END
+    return "generate_report"
+
+
 def build_research_graph() -> StateGraph:
     """연구 에이전트 그래프 빌드"""
     graph = StateGraph(ResearchState)
@@ -388,15 +522,13 @@ def build_research_graph() -> StateGraph:
     # 노드 추가
     graph.add_node("analyze", analyze_node)
     graph.add_node("search", search_node)
-    graph.add_node("generate_techniques", generate_techniques_node)
-    graph.add_node("create_report", create_report_node)
+    graph.add_node("generate_report", generate_report_node)
 
-    # 엣지 추가
+    # 엣지 추가 (불필요한 단계는 조건부 엣지로 건너뜀)
     graph.set_entry_point("analyze")
-    graph.add_edge("analyze", "search")
-    graph.add_edge("search", "generate_techniques")
-    graph.add_edge("generate_techniques", "create_report")
-    graph.add_edge("create_report", END)
+    graph.add_conditional_edges("analyze", route_after_analyze, ["search", "generate_report", END])
+    graph.add_conditional_edges("search", route_after_search, ["generate_report", END])
+    graph.add_edge("generate_report", END)
 
     return graph.compile()
 
@@ -409,7 +541,17 @@ class ResearchAgent:
     def __init__(self):
         self.graph = build_research_graph()
 
-    def run(self, request: AnalysisRequest) -> AnalysisResponse:
+    async def prewarm(self) -> None:
+        """첫 요청 전에 LLM 클라이언트/분석기/기본 검색기를 미리 생성"""
+        await asyncio.to_thread(self._prewarm_sync)
+
+    @staticmethod
+    def _prewarm_sync() -> None:
+        _technique_llm()
+        get_analyzer()
+        get_searcher()
+
+    async def run(self, request: AnalysisRequest) -> AnalysisResponse:
         """
         분석 요청 처리
 
@@ -436,7 +578,7 @@ class ResearchAgent:
             }
 
             # 그래프 실행
-            final_state = self.graph.invoke(initial_state)
+            final_state = await self.graph.ainvoke(initial_state)
 
             # 응답 생성
             if final_state.get("error"):
@@ -450,20 +592,22 @@ class ResearchAgent:
                 status="success",
                 report=final_state.get("report"),
                 metadata=final_state.get("metadata", {}),
+                # 이미 SearchResult면 재검증 없이 그대로 사용
                 sources=[
-                    SearchResult(**r.model_dump()) if isinstance(r, SearchResult) else SearchResult(**r)
+                    r if isinstance(r, SearchResult) else SearchResult.model_validate(r)
                     for r in final_state.get("search_results", [])[:10]
                 ],
             )
 
         except Exception as e:
-            logger.error(f"Agent execution failed: {e}")
+            logger.error("Agent execution failed: %s", e)
             return AnalysisResponse(
                 status="error",
                 error=str(e),
             )
 
 
+@lru_cache(maxsize=1)
 def build_research_agent() -> ResearchAgent:
-    """연구 에이전트 팩토리"""
+    """연구 에이전트 팩토리 (프로세스당 하나, 그래프 compile 1회)"""
     return ResearchAgent()
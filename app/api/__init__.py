@@ -1,4 +1,12 @@
 # app/api/__init__.py
-from .routes import router
+from .middleware import RequestLoggingMiddleware
+from .responses import ORJSONResponse
+from .routes import router, start_webhook_sender, stop_webhook_sender
 
-__all__ = ["router"]
+__all__ = [
+    "ORJSONResponse",
+    "RequestLoggingMiddleware",
+    "router",
+    "start_webhook_sender",
+    "stop_webhook_sender",
+]
@@ -0,0 +1,42 @@
+# app/api/middleware.py
+"""
+ASGI 미들웨어
+- BaseHTTPMiddleware 대신 순수 ASGI로 작성 (응답을 추가 제너레이터로 감싸지 않음)
+"""
+from __future__ import annotations
+
+import logging
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger("app.access")
+
+
+class RequestLoggingMiddleware:
+    """요청별 메서드/경로/상태 코드/처리 시간 로깅"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            logger.info(
+                "%s %s %s %.1fms",
+                scope["method"], scope["path"], status_code, (time.perf_counter() - start) * 1000,
+            )
@@ -0,0 +1,33 @@
+# app/api/responses.py
+"""
+응답 클래스
+- orjson 기반 JSON 응답 (stdlib json보다 빠름, 한글 그대로 UTF-8 출력)
+"""
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(obj: Any) -> Any:
+    """orjson이 기본 지원하지 않는 타입 처리 (datetime/UUID는 orjson이 직접 처리)"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """orjson 직렬화 (응답/웹훅 공용)"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(JSONResponse):
+    """orjson으로 직렬화하는 JSONResponse"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
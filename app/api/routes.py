@@ -6,15 +6,20 @@ FastAPI 라우터
 """
 from __future__ import annotations
 
+import asyncio
 import logging
+import re
 import uuid
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Request, Response
 
 import httpx
+import orjson
+from pydantic import BaseModel
 
 from app.schemas import (
     AnalysisRequest,
@@ -28,7 +33,9 @@ from app.schemas import (
     MethodReportRequest,
     MethodReportResponse,
 )
-from app.agents import build_research_agent
+from app.agents import ResearchAgent
+from app.api.responses import ORJSONResponse, dumps
+from app.services import get_analyzer, get_searcher
 from app.config import SETTINGS
 
 logger = logging.getLogger(__name__)
@@ -37,24 +44,70 @@ router = APIRouter()
 
 # ==================== 수신 데이터 저장소 (메모리) ====================
 # 실제 운영에서는 DB로 대체
-_received_judgements: Dict[str, Dict[str, Any]] = {}
-_received_conversations: Dict[str, Dict[str, Any]] = {}
-_analysis_results: Dict[str, Dict[str, Any]] = {}  # 분석 결과 저장
+
+class _BoundedStore(OrderedDict):
+    """
+    최대 개수를 넘으면 가장 오래된 항목부터 제거하는 dict (삽입 순서 유지)
+
+    on_evict: 제거된 (key, value)를 받아 보조 인덱스를 정리하는 콜백
+    """
+
+    def __init__(self, max_items: int, on_evict: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        super().__init__()
+        self.max_items = max_items
+        self.on_evict = on_evict
+
+    def __setitem__(self, key: str, value: Dict[str, Any]) -> None:
+        super().__setitem__(key, value)
+        if len(self) > self.max_items:
+            old_key, old_value = self.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(old_key, old_value)
+
+
+def _recent(store: Dict[str, Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """최근 limit개 (오래된 → 최신 순). 전체 값을 복사하지 않고 끝에서부터 읽음"""
+    items = list(islice(reversed(store.values()), max(limit, 0)))
+    items.reverse()
+    return items
+
+
+def _unindex_analysis(analysis_id: str, data: Dict[str, Any]) -> None:
+    """제거된 분석 결과를 case_id 인덱스에서도 제거"""
+    case_id = data.get("case_id")
+    ids = _analysis_ids_by_case.get(case_id)
+    if ids is None:
+        return
+    try:
+        ids.remove(analysis_id)
+    except ValueError:
+        pass
+    if not ids:
+        del _analysis_ids_by_case[case_id]
+
+
+_received_judgements: Dict[str, Dict[str, Any]] = _BoundedStore(SETTINGS.store_max_items)
+_received_conversations: Dict[str, Dict[str, Any]] = _BoundedStore(SETTINGS.store_max_items)
+_analysis_results: Dict[str, Dict[str, Any]] = _BoundedStore(SETTINGS.store_max_items, on_evict=_unindex_analysis)  # 분석 결과 저장
+_analysis_ids_by_case: Dict[str, List[str]] = {}  # case_id → analysis_id 목록 (저장 순서)
+_analysis_jobs: Dict[str, Dict[str, Any]] = _BoundedStore(SETTINGS.store_max_items)  # /api/analyze?background=true 작업
 _analyzed_cases: set = set()  # 이미 분석 완료된 case_id 추적
-_analyzing_cases: set = set()  # 현재 분석 중인 case_id 추적
+# 현재 분석 중인 case_id → 실행 토큰 (리셋 후 새로 시작된 분석과 구분하는 용도)
+# 같은 케이스의 중복 요청은 새 분석을 시작하지 않고 진행 중인 분석 결과(_analysis_results)를 공유
+_analyzing_cases: Dict[str, object] = {}
 
-# 에이전트 인스턴스 (lazy init)
-_agent = None
+# ==================== 응답 ====================
 
+def _respond(model: type[BaseModel], content: Any) -> Response:
+    """
+    응답 직렬화 (FastAPI response_model 검증/인코딩 단계 생략)
 
-def get_agent():
-    """에이전트 싱글톤"""
-    global _agent
-    if _agent is None:
-        logger.info("Initializing research agent...")
-        _agent = build_research_agent()
-        logger.info("Research agent ready")
-    return _agent
+    VALIDATE_API_RESPONSE=1이면 dict 응답을 스키마로 검증한 뒤 직렬화한다.
+    이미 생성된 모델 인스턴스는 생성 시 검증되었으므로 그대로 사용.
+    """
+    if SETTINGS.validate_api_response and not isinstance(content, BaseModel):
+        content = model.model_validate(content)
+    return ORJSONResponse(content)
 
 
 # ==================== 엔드포인트 ====================
@@ -73,11 +126,20 @@ async def health_check():
     )
 
 
-@router.post("/api/analyze", response_model=AnalysisResponse)
-async def analyze_data(request: AnalysisRequest):
+@router.post("/api/analyze", responses={200: {"model": AnalysisResponse}, 202: {"description": "백그라운드 작업 접수"}})
+async def analyze_data(
+    request: AnalysisRequest,
+    http_request: Request,
+    background_tasks: BackgroundTasks,
+    background: bool = False,
+) -> Response:
     """
     범용 데이터 분석 API
 
+    **파라미터:**
+    - background: True면 작업만 접수하고 202 + job_id 반환
+      (결과는 `GET /api/analyze/jobs/{job_id}`로 조회)
+
     어떤 형태의 데이터든 받아서:
     1. 데이터 분석/요약
     2. 검색 쿼리 생성
@@ -114,8 +176,23 @@ async def analyze_data(request: AnalysisRequest):
     ```
     """
     try:
-        agent = get_agent()
-        result = agent.run(request)
+        agent: ResearchAgent = http_request.app.state.agent
+
+        if background:
+            job_id = _generate_received_id("job")
+            _analysis_jobs[job_id] = {
+                "job_id": job_id,
+                "status": "pending",
+                "result": None,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+            background_tasks.add_task(_run_analysis_job, agent, job_id, request)
+            return ORJSONResponse(
+                {"job_id": job_id, "status": "pending", "poll_url": f"/api/analyze/jobs/{job_id}"},
+                status_code=202,
+            )
+
+        result = await agent.run(request)
 
         if result.status == "error":
             raise HTTPException(
@@ -123,15 +200,41 @@ async def analyze_data(request: AnalysisRequest):
                 detail=result.error or "Analysis failed",
             )
 
-        return result
+        return _respond(AnalysisResponse, result)
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"API error: {e}")
+        logger.error("API error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _run_analysis_job(agent: ResearchAgent, job_id: str, request: AnalysisRequest) -> None:
+    """백그라운드 분석 작업 실행 후 결과 저장"""
+    job = _analysis_jobs.get(job_id)
+    if job is None:
+        return
+    job["status"] = "running"
+    try:
+        result = await agent.run(request)
+        job["result"] = result
+        job["status"] = result.status
+    except Exception as e:
+        logger.error("Analysis job failed: job_id=%s, error=%s", job_id, e)
+        job["status"] = "error"
+        job["error"] = str(e)
+    job["completed_at"] = datetime.now(timezone.utc).isoformat()
+
+
+@router.get("/api/analyze/jobs/{job_id}")
+async def get_analysis_job(job_id: str) -> Response:
+    """백그라운드 분석 작업 상태/결과 조회"""
+    job = _analysis_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="작업 없음")
+    return ORJSONResponse(job)
+
+
 @router.post("/api/analyze/quick")
 async def quick_analyze(request: AnalysisRequest):
     """
@@ -140,10 +243,7 @@ async def quick_analyze(request: AnalysisRequest):
     웹 검색을 건너뛰고 데이터 분석/요약만 수행합니다.
     """
     try:
-        from app.services.analyzer import DataAnalyzer
-
-        analyzer = DataAnalyzer()
-        analysis = analyzer.analyze(
+        analysis = await get_analyzer().analyze_async(
             data=request.data,
             analysis_type=request.analysis_type,
             context=request.context,
@@ -160,7 +260,7 @@ async def quick_analyze(request: AnalysisRequest):
         }
 
     except Exception as e:
-        logger.error(f"Quick analysis error: {e}")
+        logger.error("Quick analysis error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -172,28 +272,33 @@ async def search_web(queries: List[str], extract_content: bool = True):
     검색 쿼리 리스트를 받아 웹 검색 수행
     """
     try:
-        from app.services.searcher import WebSearcher
-
-        searcher = WebSearcher()
-        results = searcher.search(
+        results = await get_searcher().asearch(
             queries=queries,
             extract_content=extract_content,
         )
 
-        return {
+        # jsonable_encoder를 거치지 않고 orjson으로 한 번에 직렬화
+        return ORJSONResponse({
             "status": "success",
             "count": len(results),
-            "results": [r.model_dump() for r in results],
-        }
+            "results": results,
+        })
 
     except Exception as e:
-        logger.error(f"Search error: {e}")
+        logger.error("Search error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # ==================== VP2 연동 엔드포인트 ====================
 
-import re
+# 한글(가-힣, 자모), 숫자, 공백, 기본 문장부호(.,!?()~) 외 문자
+_NON_KOREAN_RE = re.compile(r'[^\uAC00-\uD7A3\u3131-\u3163\u1100-\u11FF0-9\s.,!?()~]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# 턴 일괄 정제용: 턴 구분자(사설 영역 문자)는 남기고 나머지는 위와 동일하게 제거
+_TURN_SEP = "\ue000"
+_NON_KOREAN_BATCH_RE = re.compile(r'[^\uAC00-\uD7A3\u3131-\u3163\u1100-\u11FF0-9\s.,!?()~\ue000]')
+
 
 def _generate_received_id(prefix: str = "recv") -> str:
     """수신 ID 생성"""
@@ -212,12 +317,22 @@ def _clean_text_korean_only(text: str) -> str:
 
     # 한글(가-힣), 숫자(0-9), 기본 문장부호(.,!?), 공백만 허용
     # 괄호(), 쉼표, 마침표, 물음표, 느낌표는 유지
-    cleaned = re.sub(r'[^\uAC00-\uD7A3\u3131-\u3163\u1100-\u11FF0-9\s.,!?()~]', '', text)
+    cleaned = _NON_KOREAN_RE.sub('', text)
 
     # 연속 공백 제거
-    cleaned = re.sub(r'\s+', ' ', cleaned)
+    return _WHITESPACE_RE.sub(' ', cleaned).strip()
 
-    return cleaned.strip()
+
+def _clean_texts_korean_only(texts: List[str]) -> List[str]:
+    """
+    _clean_text_korean_only의 일괄 버전 (빈 결과는 제외)
+
+    턴마다 정규식을 두 번씩 돌리지 않고, 구분자로 이어 붙인 전체 텍스트에
+    한 번씩만 적용한 뒤 다시 나눈다.
+    """
+    joined = _TURN_SEP.join(t.replace(_TURN_SEP, "") for t in texts)
+    cleaned = _WHITESPACE_RE.sub(" ", _NON_KOREAN_BATCH_RE.sub("", joined))
+    return [part for part in (p.strip() for p in cleaned.split(_TURN_SEP)) if part]
 
 
 def _preprocess_turns(turns: List[Dict[str, Any]]) -> List[str]:
@@ -226,11 +341,9 @@ def _preprocess_turns(turns: List[Dict[str, Any]]) -> List[str]:
     - 영어/특수기호 제거
     - 순수 문자열 리스트로 반환
     """
-    import json
-
-    processed = []
+    texts = []
 
-    for i, t in enumerate(turns):
+    for t in turns:
         if not isinstance(t, dict):
             continue
 
@@ -239,21 +352,18 @@ def _preprocess_turns(turns: List[Dict[str, Any]]) -> List[str]:
         # text가 JSON 문자열인 경우 파싱
         if isinstance(text, str) and text.startswith("{"):
             try:
-                parsed = json.loads(text)
+                parsed = orjson.loads(text)
                 text = parsed.get("utterance") or parsed.get("dialogue") or ""
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 pass
         # text가 dict인 경우 dialogue 추출
         elif isinstance(text, dict):
             text = text.get("dialogue") or text.get("utterance") or ""
 
-        # 한글만 추출
-        clean_text = _clean_text_korean_only(str(text))
+        texts.append(str(text))
 
-        if clean_text:  # 빈 텍스트 제외
-            processed.append(clean_text)
-
-    return processed
+    # 한글만 추출 (전체 턴 일괄 처리, 빈 텍스트 제외)
+    return _clean_texts_korean_only(texts)
 
 
 def _preprocess_judgement(judgement: Dict[str, Any]) -> Dict[str, Any]:
@@ -290,11 +400,94 @@ def _preprocess_judgement(judgement: Dict[str, Any]) -> Dict[str, Any]:
     return result
 
 
+def _preprocess_payload(
+    turns: List[Dict[str, Any]],
+    judgement: Dict[str, Any],
+) -> tuple[List[str], Dict[str, Any]]:
+    """turns + judgement 전처리를 한 번에 (스레드 1회 왕복)"""
+    return _preprocess_turns(turns), _preprocess_judgement(judgement)
+
+
 def _format_turns_for_analysis(turns: List[str]) -> str:
     """대화 턴을 분석용 텍스트로 변환"""
     return "\n".join(turns)
 
 
+# ==================== Webhook 클라이언트 ====================
+# 호출마다 AsyncClient를 만들면 매번 TCP/TLS 핸드셰이크를 새로 하므로
+# keep-alive 커넥션 풀을 가진 클라이언트 하나를 재사용 (lifespan에서 생성/종료)
+_WEBHOOK_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=30)
+_webhook_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_webhook_client() -> httpx.AsyncClient:
+    """공유 webhook 클라이언트 (없거나 닫혔으면 생성)"""
+    global _webhook_client
+    if _webhook_client is None or _webhook_client.is_closed:
+        _webhook_client = httpx.AsyncClient(timeout=SETTINGS.webhook_timeout, limits=_WEBHOOK_LIMITS)
+    return _webhook_client
+
+
+# ==================== Webhook 전송 큐 ====================
+# 분석 완료마다 바로 POST하지 않고 큐에 넣어 고정 수의 워커가 전송
+# → 버스트 시에도 VP2로 가는 동시 요청 수가 webhook_workers로 제한됨
+_webhook_queue: Optional["asyncio.Queue[Dict[str, Any]]"] = None
+_webhook_workers: List["asyncio.Task[None]"] = []
+
+
+async def _webhook_worker() -> None:
+    """큐에서 payload를 꺼내 순서대로 전송"""
+    assert _webhook_queue is not None
+    while True:
+        payload = await _webhook_queue.get()
+        try:
+            await _send_webhook(payload)
+        except Exception as e:
+            logger.error("[Webhook] 워커 전송 에러: %s", e)
+        finally:
+            _webhook_queue.task_done()
+
+
+async def start_webhook_sender() -> None:
+    """앱 시작 시 webhook 클라이언트 생성 + 전송 워커 시작"""
+    global _webhook_queue
+    _get_webhook_client()
+    _webhook_queue = asyncio.Queue(maxsize=SETTINGS.webhook_queue_size)
+    _webhook_workers[:] = [
+        asyncio.create_task(_webhook_worker()) for _ in range(max(1, SETTINGS.webhook_workers))
+    ]
+
+
+async def stop_webhook_sender() -> None:
+    """앱 종료 시 남은 전송을 잠시 기다린 뒤 워커/커넥션 풀 정리"""
+    global _webhook_client, _webhook_queue
+    if _webhook_queue is not None:
+        try:
+            await asyncio.wait_for(_webhook_queue.join(), timeout=SETTINGS.webhook_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("[Webhook] 종료 시 미전송 %s건 폐기", _webhook_queue.qsize())
+    for task in _webhook_workers:
+        task.cancel()
+    await asyncio.gather(*_webhook_workers, return_exceptions=True)
+    _webhook_workers.clear()
+    _webhook_queue = None
+
+    if _webhook_client is not None:
+        await _webhook_client.aclose()
+        _webhook_client = None
+
+
+async def _enqueue_webhook(payload: Dict[str, Any]) -> None:
+    """전송 큐에 추가 (워커 미시작 또는 큐가 가득 차면 직접 전송)"""
+    if _webhook_queue is not None:
+        try:
+            _webhook_queue.put_nowait(payload)
+            return
+        except asyncio.QueueFull:
+            logger.warning("[Webhook] 전송 큐 가득 참, 직접 전송")
+    await _send_webhook(payload)
+
+
 async def _send_webhook(payload: Dict[str, Any], webhook_url: Optional[str] = None) -> bool:
     """
     분석 결과를 VP2로 전송 (Webhook)
@@ -313,29 +506,41 @@ async def _send_webhook(payload: Dict[str, Any], webhook_url: Optional[str] = No
         return False
 
     try:
-        async with httpx.AsyncClient(timeout=SETTINGS.webhook_timeout) as client:
-            response = await client.post(
-                url,
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            )
+        # orjson으로 직접 직렬화해 bytes로 전송 (httpx json=은 표준 json 사용)
+        response = await _get_webhook_client().post(
+            url,
+            content=dumps(payload),
+            headers={"Content-Type": "application/json"}
+        )
 
-            if response.status_code in (200, 201, 202):
-                logger.info(f"[Webhook] 전송 성공: {url}, status={response.status_code}")
-                return True
-            else:
-                logger.error(f"[Webhook] 전송 실패: {url}, status={response.status_code}, body={response.text[:200]}")
-                return False
+        if response.status_code in (200, 201, 202):
+            logger.info("[Webhook] 전송 성공: %s, status=%s", url, response.status_code)
+            return True
+        else:
+            logger.error("[Webhook] 전송 실패: %s, status=%s, body=%s", url, response.status_code, response.text[:200])
+            return False
 
     except httpx.TimeoutException:
-        logger.error(f"[Webhook] 타임아웃: {url}")
+        logger.error("[Webhook] 타임아웃: %s", url)
         return False
     except Exception as e:
-        logger.error(f"[Webhook] 전송 에러: {url}, error={e}")
+        logger.error("[Webhook] 전송 에러: %s, error=%s", url, e)
         return False
 
 
+def _store_analysis(data: Dict[str, Any]) -> None:
+    """분석 결과 저장 + case_id 인덱스 갱신"""
+    _analysis_results[data["analysis_id"]] = data
+    _analysis_ids_by_case.setdefault(data["case_id"], []).append(data["analysis_id"])
+
+
+def _case_analysis_pending(case_id: str) -> bool:
+    """이미 분석이 끝났거나 진행 중인 케이스인지"""
+    return case_id in _analyzed_cases or case_id in _analyzing_cases
+
+
 async def _trigger_analysis_background(
+    agent: ResearchAgent,
     case_id: str,
     turns: List[str],
     judgement: Dict[str, Any],
@@ -346,20 +551,21 @@ async def _trigger_analysis_background(
 
     # 이미 분석 완료된 케이스인지 확인
     if case_id in _analyzed_cases:
-        logger.info(f"[Background] 이미 분석 완료된 케이스, 스킵: case_id={case_id}")
+        logger.info("[Background] 이미 분석 완료된 케이스, 스킵: case_id=%s", case_id)
         return
 
     # 현재 분석 중인 케이스인지 확인
     if case_id in _analyzing_cases:
-        logger.info(f"[Background] 이미 분석 진행 중인 케이스, 스킵: case_id={case_id}")
+        logger.info("[Background] 이미 분석 진행 중인 케이스, 스킵: case_id=%s", case_id)
         return
 
-    # 분석 시작 표시
-    _analyzing_cases.add(case_id)
+    # 분석 시작 표시 (확인 ~ 등록 사이에 await가 없어 같은 케이스가 중복 시작되지 않음)
+    token = object()
+    _analyzing_cases[case_id] = token
     analysis_id = f"analysis_{case_id}_{uuid.uuid4().hex[:8]}"
 
     try:
-        logger.info(f"[Background] 분석 시작: case_id={case_id}")
+        logger.info("[Background] 분석 시작: case_id=%s", case_id)
 
         # 대화를 텍스트로 변환
         conversation_text = _format_turns_for_analysis(turns)
@@ -373,20 +579,21 @@ async def _trigger_analysis_background(
         }
 
         # 에이전트로 분석 실행
-        agent = get_agent()
         request = AnalysisRequest(
             data=conversation_text,
             analysis_type="conversation",
             context=context,
         )
-        result = agent.run(request)
+        result = await agent.run(request)
 
-        # 분석 결과 저장
+        # 분석 결과 저장 (저장/웹훅 공용으로 한 번만 dict 변환)
         report_data = None
         techniques = []
         if result.report:
             report_data = result.report.model_dump() if hasattr(result.report, 'model_dump') else result.report
-            techniques = result.report.techniques if hasattr(result.report, 'techniques') else []
+            # 리포트 dump에 이미 포함된 techniques를 재사용
+            techniques = report_data.get("techniques", []) if isinstance(report_data, dict) else []
+        sources = [s.model_dump() for s in result.sources] if result.sources else []
 
         analysis_data = {
             "analysis_id": analysis_id,
@@ -394,19 +601,19 @@ async def _trigger_analysis_background(
             "status": result.status,
             "input_turns": turns,
             "input_text": conversation_text,
-            "sources": [s.model_dump() for s in result.sources] if result.sources else [],
-            "sources_count": len(result.sources) if result.sources else 0,
-            "techniques": [t.model_dump() if hasattr(t, 'model_dump') else t for t in techniques] if techniques else [],
+            "sources": sources,
+            "sources_count": len(sources),
+            "techniques": techniques,
             "report": report_data,
             "metadata": result.metadata or {},
             "error": result.error,
-            "analyzed_at": datetime.utcnow().isoformat(),
+            "analyzed_at": datetime.now(timezone.utc).isoformat(),
         }
 
         # 메모리에 저장
-        _analysis_results[analysis_id] = analysis_data
+        _store_analysis(analysis_data)
 
-        logger.info(f"[Background] 분석 완료: case_id={case_id}, status={result.status}, analysis_id={analysis_id}")
+        logger.info("[Background] 분석 완료: case_id=%s, status=%s, analysis_id=%s", case_id, result.status, analysis_id)
 
         # Webhook으로 VP2에 전송
         if result.status == "success":
@@ -415,17 +622,17 @@ async def _trigger_analysis_background(
                 "case_id": case_id,
                 "analysis_id": analysis_id,
                 "report": report_data,
-                "techniques": [t.model_dump() if hasattr(t, 'model_dump') else t for t in techniques] if techniques else [],
-                "sources_count": len(result.sources) if result.sources else 0,
-                "analyzed_at": datetime.utcnow().isoformat(),
+                "techniques": techniques,
+                "sources_count": len(sources),
+                "analyzed_at": datetime.now(timezone.utc).isoformat(),
             }
-            await _send_webhook(webhook_payload)
+            await _enqueue_webhook(webhook_payload)
 
             # 분석 완료 표시
             _analyzed_cases.add(case_id)
 
     except Exception as e:
-        logger.error(f"[Background] 분석 실패: case_id={case_id}, error={e}")
+        logger.error("[Background] 분석 실패: case_id=%s, error=%s", case_id, e)
         # 에러도 저장
         error_data = {
             "analysis_id": analysis_id,
@@ -433,9 +640,9 @@ async def _trigger_analysis_background(
             "status": "error",
             "input_turns": turns,
             "error": str(e),
-            "analyzed_at": datetime.utcnow().isoformat(),
+            "analyzed_at": datetime.now(timezone.utc).isoformat(),
         }
-        _analysis_results[analysis_id] = error_data
+        _store_analysis(error_data)
 
         # 에러도 webhook으로 전송
         error_payload = {
@@ -443,21 +650,23 @@ async def _trigger_analysis_background(
             "case_id": case_id,
             "analysis_id": analysis_id,
             "error": str(e),
-            "analyzed_at": datetime.utcnow().isoformat(),
+            "analyzed_at": datetime.now(timezone.utc).isoformat(),
         }
-        await _send_webhook(error_payload)
+        await _enqueue_webhook(error_payload)
 
     finally:
-        # 분석 중 상태 해제
-        _analyzing_cases.discard(case_id)
+        # 분석 중 상태 해제 (진행 중 리셋 후 시작된 다른 분석의 표시는 건드리지 않음)
+        if _analyzing_cases.get(case_id) is token:
+            del _analyzing_cases[case_id]
 
 
-@router.post("/api/v1/judgements", response_model=JudgementResponse)
+@router.post("/api/v1/judgements", responses={200: {"model": JudgementResponse}})
 async def receive_judgement(
     request: JudgementRequest,
     background_tasks: BackgroundTasks,
+    http_request: Request,
     auto_analyze: bool = True
-):
+) -> Response:
     """
     VP2로부터 판정+대화 데이터 수신
 
@@ -473,13 +682,13 @@ async def receive_judgement(
         received_id = _generate_received_id("jdg")
 
         # ★ 전처리: 한글만 추출, 영어/특수기호 제거
-        processed_turns = _preprocess_turns(request.turns)
-        processed_judgement = _preprocess_judgement(request.judgement)
-
-        logger.info(
-            f"[VP2] 전처리: 원본 {len(request.turns)}턴 → 정제 {len(processed_turns)}턴"
+        # (턴이 많으면 CPU 작업이 길어지므로 이벤트 루프를 막지 않도록 스레드에서 실행)
+        processed_turns, processed_judgement = await asyncio.to_thread(
+            _preprocess_payload, request.turns, request.judgement
         )
 
+        logger.info("[VP2] 전처리: 원본 %s턴 → 정제 %s턴", len(request.turns), len(processed_turns))
+
         # 수신 데이터 저장 (전처리된 데이터)
         stored_data = {
             "received_id": received_id,
@@ -491,21 +700,24 @@ async def receive_judgement(
             "scenario": request.scenario,
             "victim_profile": request.victim_profile,
             "source": request.source,
-            "received_at": datetime.utcnow().isoformat(),
+            "received_at": datetime.now(timezone.utc).isoformat(),
         }
         _received_judgements[received_id] = stored_data
 
         logger.info(
-            f"[VP2] 판정 수신: case_id={request.case_id}, "
-            f"round={request.round_no}, turns={len(processed_turns)}, "
-            f"phishing={processed_judgement.get('phishing')}"
+            "[VP2] 판정 수신: case_id=%s, round=%s, turns=%s, phishing=%s",
+            request.case_id, request.round_no, len(processed_turns), processed_judgement.get("phishing"),
         )
 
         # 선택적 백그라운드 분석 (전처리된 데이터 사용)
+        # 이미 끝났거나 진행 중인 케이스는 중복 분석 작업을 예약하지 않음
         analysis_triggered = False
-        if auto_analyze:
+        if auto_analyze and _case_analysis_pending(request.case_id):
+            logger.info("[VP2] 이미 분석 완료/진행 중인 케이스, 트리거 생략: case_id=%s", request.case_id)
+        elif auto_analyze:
             background_tasks.add_task(
                 _trigger_analysis_background,
+                agent=http_request.app.state.agent,
                 case_id=request.case_id,
                 turns=processed_turns,  # 전처리된 turns
                 judgement=processed_judgement,  # 전처리된 judgement
@@ -513,25 +725,26 @@ async def receive_judgement(
                 victim_profile=request.victim_profile,
             )
             analysis_triggered = True
-            logger.info(f"[VP2] 백그라운드 분석 트리거: case_id={request.case_id}")
-
-        return JudgementResponse(
-            ok=True,
-            received_id=received_id,
-            case_id=request.case_id,
-            round_no=request.round_no,
-            turns_count=len(request.turns),
-            message="판정 데이터 수신 완료",
-            analysis_triggered=analysis_triggered,
-        )
+            logger.info("[VP2] 백그라운드 분석 트리거: case_id=%s", request.case_id)
+
+        return _respond(JudgementResponse, {
+            "ok": True,
+            "received_id": received_id,
+            "case_id": request.case_id,
+            "round_no": request.round_no,
+            "turns_count": len(request.turns),
+            "message": "판정 데이터 수신 완료",
+            "analysis_triggered": analysis_triggered,
+            "timestamp": datetime.now(timezone.utc),
+        })
 
     except Exception as e:
-        logger.error(f"[VP2] 판정 수신 실패: {e}")
+        logger.error("[VP2] 판정 수신 실패: %s", e)
         raise HTTPException(status_code=500, detail=f"판정 수신 실패: {e}")
 
 
-@router.post("/api/v1/conversations", response_model=ConversationResponse)
-async def receive_conversation(request: ConversationRequest):
+@router.post("/api/v1/conversations", responses={200: {"model": ConversationResponse}})
+async def receive_conversation(request: ConversationRequest) -> Response:
     """
     VP2로부터 대화 데이터 수신 (기존 호환)
     """
@@ -547,28 +760,28 @@ async def receive_conversation(request: ConversationRequest):
             "victim_profile": request.victim_profile,
             "guidance": request.guidance,
             "judgement": request.judgement,
-            "received_at": datetime.utcnow().isoformat(),
+            "received_at": datetime.now(timezone.utc).isoformat(),
         }
         _received_conversations[received_id] = stored_data
 
         logger.info(
-            f"[VP2] 대화 수신: case_id={request.case_id}, "
-            f"round={request.round_no}, turns={len(request.turns)}"
+            "[VP2] 대화 수신: case_id=%s, round=%s, turns=%s",
+            request.case_id, request.round_no, len(request.turns),
         )
 
-        return ConversationResponse(
-            ok=True,
-            received_id=received_id,
-            message="대화 데이터 수신 완료",
-        )
+        return _respond(ConversationResponse, {
+            "ok": True,
+            "received_id": received_id,
+            "message": "대화 데이터 수신 완료",
+        })
 
     except Exception as e:
-        logger.error(f"[VP2] 대화 수신 실패: {e}")
+        logger.error("[VP2] 대화 수신 실패: %s", e)
         raise HTTPException(status_code=500, detail=f"대화 수신 실패: {e}")
 
 
-@router.post("/api/v1/methods/report", response_model=MethodReportResponse)
-async def request_method_report(request: MethodReportRequest):
+@router.post("/api/v1/methods/report", responses={200: {"model": MethodReportResponse}})
+async def request_method_report(request: MethodReportRequest) -> Response:
     """
     웹 서치 기반 새로운 수법 리포트 생성
 
@@ -587,14 +800,12 @@ async def request_method_report(request: MethodReportRequest):
             queries.extend([f"보이스피싱 {kw}" for kw in request.keywords[:3]])
 
         logger.info(
-            f"[VP2] 수법 리포트 요청: case_id={request.case_id}, "
-            f"scenario={request.scenario_type}, queries={len(queries)}"
+            "[VP2] 수법 리포트 요청: case_id=%s, scenario=%s, queries=%s",
+            request.case_id, request.scenario_type, len(queries),
         )
 
         # 웹 검색 수행
-        from app.services.searcher import WebSearcher
-        searcher = WebSearcher()
-        results = searcher.search(queries=queries, extract_content=True)
+        results = await get_searcher().asearch(queries=queries, extract_content=True)
 
         # 결과 정리
         sources = list(set(r.url for r in results))
@@ -610,19 +821,20 @@ async def request_method_report(request: MethodReportRequest):
         # 요약 생성 (간단)
         summary = f"{request.scenario_type} 관련 최신 수법 {len(new_methods)}건 탐색 완료"
 
-        return MethodReportResponse(
-            report_id=report_id,
-            new_methods=new_methods,
-            sources=sources[:10],
-            summary=summary,
-            recommendations=[
+        return _respond(MethodReportResponse, {
+            "report_id": report_id,
+            "new_methods": new_methods,
+            "sources": sources[:10],
+            "summary": summary,
+            "recommendations": [
                 f"{request.scenario_type} 시나리오에서 발견된 취약점 활용 권장",
                 "검색된 최신 수법 참고하여 공격 전략 보강",
             ],
-        )
+            "created_at": datetime.now(timezone.utc),
+        })
 
     except Exception as e:
-        logger.error(f"[VP2] 수법 리포트 생성 실패: {e}")
+        logger.error("[VP2] 수법 리포트 생성 실패: %s", e)
         raise HTTPException(status_code=500, detail=f"수법 리포트 생성 실패: {e}")
 
 
@@ -631,12 +843,12 @@ async def request_method_report(request: MethodReportRequest):
 @router.get("/api/v1/judgements")
 async def list_received_judgements(limit: int = 50):
     """수신된 판정 목록 조회"""
-    items = list(_received_judgements.values())[-limit:]
-    return {
+    items = _recent(_received_judgements, limit)
+    return ORJSONResponse({
         "ok": True,
         "count": len(items),
         "items": items,
-    }
+    })
 
 
 @router.get("/api/v1/judgements/{received_id}")
@@ -645,18 +857,18 @@ async def get_received_judgement(received_id: str):
     data = _received_judgements.get(received_id)
     if not data:
         raise HTTPException(status_code=404, detail="판정 데이터 없음")
-    return {"ok": True, "data": data}
+    return ORJSONResponse({"ok": True, "data": data})
 
 
 @router.get("/api/v1/conversations")
 async def list_received_conversations(limit: int = 50):
     """수신된 대화 목록 조회"""
-    items = list(_received_conversations.values())[-limit:]
-    return {
+    items = _recent(_received_conversations, limit)
+    return ORJSONResponse({
         "ok": True,
         "count": len(items),
         "items": items,
-    }
+    })
 
 
 @router.get("/api/v1/conversations/{received_id}")
@@ -665,7 +877,7 @@ async def get_received_conversation(received_id: str):
     data = _received_conversations.get(received_id)
     if not data:
         raise HTTPException(status_code=404, detail="대화 데이터 없음")
-    return {"ok": True, "data": data}
+    return ORJSONResponse({"ok": True, "data": data})
 
 
 # ==================== 분석 결과 조회 엔드포인트 ====================
@@ -673,12 +885,12 @@ async def get_received_conversation(received_id: str):
 @router.get("/api/v1/analysis")
 async def list_analysis_results(limit: int = 50):
     """분석 결과 목록 조회"""
-    items = list(_analysis_results.values())[-limit:]
-    return {
+    items = _recent(_analysis_results, limit)
+    return ORJSONResponse({
         "ok": True,
         "count": len(items),
         "items": items,
-    }
+    })
 
 
 @router.get("/api/v1/analysis/{analysis_id}")
@@ -687,16 +899,17 @@ async def get_analysis_result(analysis_id: str):
     data = _analysis_results.get(analysis_id)
     if not data:
         raise HTTPException(status_code=404, detail="분석 결과 없음")
-    return {"ok": True, "data": data}
+    return ORJSONResponse({"ok": True, "data": data})
 
 
 @router.get("/api/v1/analysis/case/{case_id}")
 async def get_analysis_by_case(case_id: str):
     """case_id로 분석 결과 조회"""
-    results = [v for v in _analysis_results.values() if v.get("case_id") == case_id]
+    ids = _analysis_ids_by_case.get(case_id, ())
+    results = [_analysis_results[i] for i in ids if i in _analysis_results]
     if not results:
         raise HTTPException(status_code=404, detail="해당 케이스의 분석 결과 없음")
-    return {"ok": True, "count": len(results), "items": results}
+    return ORJSONResponse({"ok": True, "count": len(results), "items": results})
 
 
 @router.delete("/api/v1/analysis/case/{case_id}/reset")
@@ -709,9 +922,9 @@ async def reset_case_analysis(case_id: str):
     was_analyzing = case_id in _analyzing_cases
 
     _analyzed_cases.discard(case_id)
-    _analyzing_cases.discard(case_id)
+    _analyzing_cases.pop(case_id, None)
 
-    logger.info(f"[Reset] 케이스 분석 상태 리셋: case_id={case_id}, was_analyzed={was_analyzed}, was_analyzing={was_analyzing}")
+    logger.info("[Reset] 케이스 분석 상태 리셋: case_id=%s, was_analyzed=%s, was_analyzing=%s", case_id, was_analyzed, was_analyzing)
 
     return {
         "ok": True,
@@ -10,36 +10,68 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# .env 반영 후 환경변수를 한 번만 읽어 둠
+_ENV = dict(os.environ)
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class Settings:
     """애플리케이션 설정"""
 
     # API Keys
-    tavily_api_key: str = field(default_factory=lambda: os.getenv("TAVILY_API_KEY", ""))
-    openai_api_key: str = field(default_factory=lambda: os.getenv("OPENAI_API_KEY", ""))
+    tavily_api_key: str = field(default_factory=lambda: _ENV.get("TAVILY_API_KEY", ""))
+    openai_api_key: str = field(default_factory=lambda: _ENV.get("OPENAI_API_KEY", ""))
 
     # Model
-    model_name: str = field(default_factory=lambda: os.getenv("MODEL_NAME", "gpt-4o-mini"))
+    model_name: str = field(default_factory=lambda: _ENV.get("MODEL_NAME", "gpt-4o-mini"))
+
+    # LLM 타임아웃 (평균 지연보다 약간 길게 → 초과 시 재시도, 시도마다 2배, 상한 cap)
+    llm_timeout_p50: float = field(default_factory=lambda: float(_ENV.get("LLM_TIMEOUT_P50", "45")))
+    llm_timeout_cap: float = field(default_factory=lambda: float(_ENV.get("LLM_TIMEOUT_CAP", "180")))
+    llm_max_retries: int = field(default_factory=lambda: int(_ENV.get("LLM_MAX_RETRIES", "3")))
+
+    # 분석기 LLM 응답 캐시 (같은 모델+프롬프트 재호출 생략). 디렉터리를 주면 diskcache로 재시작 후에도 유지
+    llm_cache_disabled: bool = field(default_factory=lambda: _ENV.get("LLM_CACHE_DISABLED", "0") == "1")
+    llm_cache_dir: str = field(default_factory=lambda: _ENV.get("LLM_CACHE_DIR", ""))
 
     # Chroma (optional, for future use)
-    chroma_persist_dir: str = field(default_factory=lambda: os.getenv("CHROMA_PERSIST_DIR", "./chroma_data"))
-    chroma_collection: str = field(default_factory=lambda: os.getenv("CHROMA_COLLECTION", "research_data"))
+    chroma_persist_dir: str = field(default_factory=lambda: _ENV.get("CHROMA_PERSIST_DIR", "./chroma_data"))
+    chroma_collection: str = field(default_factory=lambda: _ENV.get("CHROMA_COLLECTION", "research_data"))
+
+    # Embeddings: openai(기본) 또는 local(sentence-transformers, CPU에서 실행 → API 왕복 없음)
+    # backend/모델을 바꾸면 벡터 차원이 달라지므로 CHROMA_COLLECTION도 새 이름으로 바꿔야 함
+    embedding_backend: str = field(default_factory=lambda: _ENV.get("EMBEDDING_BACKEND", "openai"))
+    embedding_model: str = field(default_factory=lambda: _ENV.get("EMBEDDING_MODEL", ""))
 
     # Search
-    default_max_results: int = field(default_factory=lambda: int(os.getenv("MAX_RESULTS", "3")))
-    default_search_depth: str = field(default_factory=lambda: os.getenv("SEARCH_DEPTH", "basic"))
+    default_max_results: int = field(default_factory=lambda: int(_ENV.get("MAX_RESULTS", "3")))
+    default_search_depth: str = field(default_factory=lambda: _ENV.get("SEARCH_DEPTH", "basic"))
 
     # Crawling
-    crawl_timeout: int = field(default_factory=lambda: int(os.getenv("CRAWL_TIMEOUT", "10")))
-    max_content_length: int = field(default_factory=lambda: int(os.getenv("MAX_CONTENT_LENGTH", "3000")))
+    crawl_timeout: int = field(default_factory=lambda: int(_ENV.get("CRAWL_TIMEOUT", "10")))
+    max_content_length: int = field(default_factory=lambda: int(_ENV.get("MAX_CONTENT_LENGTH", "3000")))
+
+    # 배치 요청 시 동시에 실행할 에이전트 그래프 수
+    agent_concurrency: int = field(default_factory=lambda: int(_ENV.get("AGENT_CONCURRENCY", "8")))
+
+    # 빌드 직후 벡터DB/임베딩 클라이언트 워밍업 (첫 요청 콜드 스타트 방지)
+    app_warmup: bool = field(default_factory=lambda: _ENV.get("APP_WARMUP", "1") == "1")
+
+    # 메모리 저장소(수신 판정/대화, 분석 결과)별 최대 보관 수 (초과 시 오래된 것부터 제거)
+    store_max_items: int = field(default_factory=lambda: int(_ENV.get("STORE_MAX_ITEMS", "10000")))
+
+    # API 응답을 response 스키마로 다시 검증 (개발용, 운영은 검증 없이 바로 직렬화)
+    validate_api_response: bool = field(default_factory=lambda: _ENV.get("VALIDATE_API_RESPONSE", "0") == "1")
 
     # Logging
-    log_level: str = field(default_factory=lambda: os.getenv("LOG_LEVEL", "INFO"))
+    log_level: str = field(default_factory=lambda: _ENV.get("LOG_LEVEL", "INFO"))
 
     # Webhook - VP2로 결과 전송
-    webhook_url: str = field(default_factory=lambda: os.getenv("WEBHOOK_URL", ""))
-    webhook_timeout: int = field(default_factory=lambda: int(os.getenv("WEBHOOK_TIMEOUT", "30")))
+    webhook_url: str = field(default_factory=lambda: _ENV.get("WEBHOOK_URL", ""))
+    webhook_timeout: int = field(default_factory=lambda: int(_ENV.get("WEBHOOK_TIMEOUT", "30")))
+    # 전송 큐를 처리하는 워커 수 (= VP2로 동시에 보내는 최대 요청 수) / 큐 크기
+    webhook_workers: int = field(default_factory=lambda: int(_ENV.get("WEBHOOK_WORKERS", "4")))
+    webhook_queue_size: int = field(default_factory=lambda: int(_ENV.get("WEBHOOK_QUEUE_SIZE", "1000")))
 
 
 # 싱글톤 설정 인스턴스
@@ -0,0 +1,213 @@
+# app/llm.py
+"""
+LLM 클라이언트 관리
+- 동일한 설정의 ChatOpenAI를 프로세스 전역에서 재사용
+- 모든 클라이언트(임베딩 포함)가 하나의 httpx 커넥션 풀을 공유 (비동기 풀은 이벤트 루프별)
+- Rate limit 쿨다운을 프로세스 전역에서 공유
+- 동시에 들어온 동일 프롬프트 호출은 하나로 합침
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+from langchain_openai import ChatOpenAI
+from openai import APIConnectionError, InternalServerError, RateLimitError
+
+from app.config import SETTINGS
+
+logger = logging.getLogger(__name__)
+
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+
+
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.Client:
+    """OpenAI 클라이언트(LLM/임베딩) 공용 동기 커넥션 풀"""
+    return httpx.Client(limits=_HTTP_LIMITS)
+
+
+class _PerLoopTransport(httpx.AsyncBaseTransport):
+    """
+    이벤트 루프별 커넥션 풀로 요청을 넘기는 transport
+
+    풀의 연결은 처음 사용한 루프에 묶이므로, 하나의 AsyncClient를 여러 루프
+    (asyncio.run 반복 호출, 워커 스레드, 테스트)에서 써도 루프마다 따로 연결한다.
+    닫힌 루프의 풀은 다음 요청 때 버린다 (풀의 연결이 루프를 참조하므로 약한 참조로는 안 풀림).
+    """
+
+    def __init__(self, **kwargs: Any):
+        self._kwargs = kwargs
+        self._pools: Dict[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            for dead in [l for l in self._pools if l.is_closed()]:
+                del self._pools[dead]
+            pool = self._pools.get(loop)
+            if pool is None:
+                pool = httpx.AsyncHTTPTransport(**self._kwargs)
+                self._pools[loop] = pool
+            return pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._pool().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """현재 루프의 풀만 닫음 (다른 루프의 연결은 그 루프에서만 닫을 수 있음)"""
+        with self._lock:
+            pool = self._pools.pop(asyncio.get_running_loop(), None)
+        if pool is not None:
+            await pool.aclose()
+
+
+@lru_cache(maxsize=1)
+def _async_transport() -> _PerLoopTransport:
+    return _PerLoopTransport(limits=_HTTP_LIMITS)
+
+
+@lru_cache(maxsize=1)
+def get_http_async_client() -> httpx.AsyncClient:
+    """
+    OpenAI 클라이언트(LLM/임베딩) 공용 비동기 클라이언트
+
+    클라이언트 객체는 프로세스 전역이지만 커넥션 풀은 이벤트 루프별로 따로 둔다.
+    클라이언트 자체는 닫지 않고, 루프 종료 전에 close_http_async_pool()로 그 루프의 연결을 정리한다.
+    """
+    return httpx.AsyncClient(transport=_async_transport())
+
+
+async def close_http_async_pool() -> None:
+    """현재 이벤트 루프의 OpenAI 커넥션 풀 닫기 (FastAPI lifespan 종료 시)"""
+    await _async_transport().aclose()
+
+
+@lru_cache(maxsize=16)
+def get_llm(
+    model_name: Optional[str] = None,
+    temperature: float = 0,
+    timeout: int = 60,
+    max_retries: int = 2,
+    streaming: bool = False,
+    prompt_cache_key: Optional[str] = None,
+) -> ChatOpenAI:
+    """
+    설정별 ChatOpenAI 싱글톤
+
+    매 그래프 빌드/요청마다 클라이언트를 새로 만들지 않고,
+    인자 조합당 하나만 생성해 재사용한다.
+
+    prompt_cache_key: 같은 시스템 프롬프트를 쓰는 호출을 같은 키로 묶어
+    OpenAI 프롬프트 캐시 적중률을 높인다 (프리픽스 1024 토큰 이상일 때 적용).
+    """
+    model_kwargs = {"prompt_cache_key": prompt_cache_key} if prompt_cache_key else {}
+    return ChatOpenAI(
+        model=model_name or SETTINGS.model_name,
+        temperature=temperature,
+        timeout=timeout,
+        max_retries=max_retries,
+        streaming=streaming,
+        model_kwargs=model_kwargs,
+        http_client=get_http_client(),
+        http_async_client=get_http_async_client(),
+    )
+
+
+# ==================== Rate limit 쿨다운 ====================
+# 한 호출이 429를 받으면 Retry-After 동안 다른 호출도 미리 대기해
+# 어차피 거절될 요청을 보내지 않는다.
+# (재시도는 ChatOpenAI max_retries 또는 call_with_timeout_retry 중 한 곳에서만)
+_cooldown_until: float = 0.0
+
+
+async def wait_for_cooldown() -> None:
+    """진행 중인 rate limit 쿨다운이 끝날 때까지 대기"""
+    delay = _cooldown_until - time.monotonic()
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+def note_rate_limit(error: Exception, default_wait: float = 1.0) -> None:
+    """RateLimitError의 Retry-After 헤더로 전역 쿨다운 갱신"""
+    global _cooldown_until
+
+    retry_after = default_wait
+    response = getattr(error, "response", None)
+    if response is not None:
+        try:
+            retry_after = float(response.headers.get("retry-after", default_wait))
+        except (TypeError, ValueError):
+            pass
+
+    _cooldown_until = max(_cooldown_until, time.monotonic() + retry_after)
+
+
+# ==================== 타임아웃 + 재시도 ====================
+
+async def call_with_timeout_retry(
+    make_call: Callable[[], Awaitable[Any]],
+    base_timeout: Optional[float] = None,
+    max_retries: Optional[int] = None,
+) -> Any:
+    """
+    LLM 호출을 평균 지연보다 약간 긴 타임아웃으로 실행하고, 넘기면 재시도
+
+    느린 꼬리 요청 하나가 파이프라인 전체를 붙잡지 않도록 한다.
+    시도마다 타임아웃을 2배로 늘리되 SETTINGS.llm_timeout_cap을 넘지 않는다.
+    429/5xx/연결 오류도 같은 시도 횟수 안에서 재시도하므로 (429는 쿨다운 후)
+    이 함수로 감싸는 LLM은 max_retries=0으로 만들어야 호출 수가 곱해지지 않는다.
+
+    Args:
+        make_call: 호출마다 새 코루틴을 만드는 함수
+        base_timeout: 첫 시도 타임아웃 (기본 SETTINGS.llm_timeout_p50)
+        max_retries: 최대 시도 횟수 (기본 SETTINGS.llm_max_retries)
+    """
+    timeout = float(base_timeout or SETTINGS.llm_timeout_p50)
+    attempts = max(1, max_retries or SETTINGS.llm_max_retries)
+
+    for attempt in range(attempts):
+        current = min(timeout, SETTINGS.llm_timeout_cap)
+        try:
+            await wait_for_cooldown()
+            return await asyncio.wait_for(make_call(), timeout=current)
+        except asyncio.TimeoutError:
+            if attempt == attempts - 1:
+                raise
+            logger.warning("LLM call timed out after %.1fs, retrying (%d/%d)", current, attempt + 1, attempts)
+            timeout *= 2
+        except (RateLimitError, InternalServerError, APIConnectionError) as e:
+            if attempt == attempts - 1:
+                raise
+            if isinstance(e, RateLimitError):
+                note_rate_limit(e)
+            logger.warning("LLM call failed (%s), retrying (%d/%d)", type(e).__name__, attempt + 1, attempts)
+
+
+# ==================== 동일 호출 합치기 ====================
+# 같은 입력으로 동시에 들어온 요청이 각자 LLM을 호출하지 않도록
+# 진행 중인 호출의 결과를 함께 기다린다. (완료되면 바로 제거 → 결과 캐시는 아님)
+_inflight: Dict[str, "asyncio.Task[Any]"] = {}
+
+
+async def coalesce_call(key: str, make_call: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    key가 같은 호출이 진행 중이면 그 결과를 공유, 없으면 새로 실행
+
+    한 요청이 취소돼도 같은 호출을 기다리는 다른 요청은 영향받지 않는다.
+    """
+    loop = asyncio.get_running_loop()
+    task = _inflight.get(key)
+    if task is None or task.get_loop() is not loop:
+        task = loop.create_task(make_call())
+        _inflight[key] = task
+        task.add_done_callback(lambda t: _inflight.pop(key, None) if _inflight.get(key) is t else None)
+    else:
+        logger.info("Joining in-flight LLM call %s", key[:8])
+    return await asyncio.shield(task)
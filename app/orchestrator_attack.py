@@ -1,12 +1,20 @@
 # app/orchestrator_attack.py
 from __future__ import annotations
 
-import json
-from typing import Any, Dict, Optional
-from langchain_openai import OpenAIEmbeddings
+import asyncio
+import copy
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import orjson
 
 from app.agent_graph_attack import build_attack_enhancement_agent_graph
-from app.tools.store import get_chroma
+from app.tools.query_cache import QueryCache, register_query_cache
+from app.utils import aparse_llm_json, parse_llm_json
+from app.tools.store import get_chroma_cached, get_embeddings
 
 try:
     from app.config import SETTINGS
@@ -14,52 +22,272 @@ except Exception:
     SETTINGS = None
 
 
+logger = logging.getLogger(__name__)
+
+# 유사한 대화 요약이면 에이전트 루프 전체를 건너뛰고 이전 결과 재사용
+# 값은 (요약 외 입력 지문, 결과 복사본)
+_RESULT_CACHE = register_query_cache(QueryCache(max_size=2000, ttl=300.0, threshold=0.97))
+
+
+def _stable_tid(prefix: str, key: str) -> str:
+    """프로세스/워커가 달라도 같은 입력이면 같은 thread_id (내장 hash()는 실행마다 달라짐)"""
+    return f"{prefix}_{hashlib.blake2b(key.encode(), digest_size=8).hexdigest()}"
+
+
 class AttackEnhancementOrchestrator:
-    def __init__(self, app):
+    def __init__(self, app, embeddings=None, model_name: Optional[str] = None):
         self.app = app
+        self.embeddings = embeddings
+        self.model_name = model_name
     
     def handle(self, request: Dict[str, Any], thread_id: Optional[str] = None) -> Dict[str, Any]:
-        """공격 강화 분석 요청 처리"""
+        """
+        공격 강화 분석 요청 처리 (CLI/스크립트 등 동기 호출용)
+
+        이벤트 루프 안(FastAPI 핸들러 등)에서 호출되면 별도 스레드의 새 루프에서 실행한다.
+        이 경우 완료될 때까지 호출한 루프도 멈추므로, 비동기 코드에서는 ahandle을 await 하는 편이 낫다.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.ahandle(request, thread_id=thread_id))
+        
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, self.ahandle(request, thread_id=thread_id)).result()
+
+    def _build_run(
+        self, request: Dict[str, Any], thread_id: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """그래프 입력과 실행 설정 구성"""
         if thread_id is None:
-            thread_id = f"attack_{hash(request.get('conversation_summary', ''))}"
+            thread_id = _stable_tid("attack", request.get("conversation_summary", ""))
         
-        input_text = json.dumps(request, ensure_ascii=False)
+        input_text = orjson.dumps(request).decode()
         
         inputs = {"messages": [{"role": "user", "content": input_text}]}
-        config = {"configurable": {"thread_id": thread_id}}
+        # max_concurrency: 병렬 검색 브랜치 수 제한 (Tavily/웹 쿼터 보호)
+        config = {"configurable": {"thread_id": thread_id}, "max_concurrency": 5}
+        return inputs, config
+
+    async def astream(
+        self, request: Dict[str, Any], thread_id: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        에이전트 LLM 출력 토큰을 생성되는 대로 전달
+
+        FastAPI StreamingResponse 등에 그대로 넘길 수 있다.
+        도구 내부의 LLM 호출 토큰은 제외하고 agent 노드 출력만 내보낸다.
+        """
+        inputs, config = self._build_run(request, thread_id)
         
-        out_state = self.app.invoke(inputs, config=config)
+        async for event in self.app.astream_events(inputs, config=config, version="v2"):
+            if event["event"] != "on_chat_model_stream":
+                continue
+            if event.get("metadata", {}).get("langgraph_node") != "agent":
+                continue
+            content = event["data"]["chunk"].content
+            if isinstance(content, str) and content:
+                yield content
+
+    async def astream_parsed(
+        self, request: Dict[str, Any], thread_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        단계별 중간 결과를 파싱된 dict로 전달
+
+        최종 리포트를 기다리지 않고 도구 결과(분석, 검색어, 수법 등)가
+        나오는 대로 넘긴다. 마지막 이벤트는 {"event": "final", "data": ...}.
+        """
+        inputs, config = self._build_run(request, thread_id)
+
+        async for update in self.app.astream(inputs, config=config, stream_mode="updates"):
+            for node, delta in update.items():
+                if not delta:
+                    continue
+                if node == "search_branch":
+                    yield {"event": "search_results", "data": delta.get("vulnerability_info") or []}
+                    continue
+
+                for m in delta.get("messages") or []:
+                    content = getattr(m, "content", None)
+                    if not isinstance(content, str):
+                        continue
+                    if node == "tools":
+                        yield {"event": "tool_result", "tool": m.name, "data": await _try_parse(content)}
+                    elif node == "finalize_report" or (node == "agent" and not getattr(m, "tool_calls", None)):
+                        yield {"event": "final", "data": await _try_parse(content)}
+
+    async def _embed_summary(self, request: Dict[str, Any]) -> Optional[List[float]]:
+        """캐시 조회용 대화 요약 임베딩 (실패 시 캐시 없이 진행)"""
+        summary = request.get("conversation_summary")
+        if self.embeddings is None or not summary:
+            return None
+        try:
+            return await self.embeddings.aembed_query(summary)
+        except Exception:
+            return None
+
+    async def _embed_summaries(self, requests: List[Dict[str, Any]]) -> List[Optional[List[float]]]:
+        """여러 요청의 대화 요약을 임베딩 API 한 번으로 계산 (실패 시 전부 None)"""
+        vectors: List[Optional[List[float]]] = [None] * len(requests)
+        if self.embeddings is None:
+            return vectors
+        
+        idx = [i for i, r in enumerate(requests) if r.get("conversation_summary")]
+        if not idx:
+            return vectors
+        try:
+            embedded = await self.embeddings.aembed_documents(
+                [requests[i]["conversation_summary"] for i in idx]
+            )
+        except Exception:
+            return vectors
+        for i, vec in zip(idx, embedded):
+            vectors[i] = vec
+        return vectors
+
+    async def ahandle(self, request: Dict[str, Any], thread_id: Optional[str] = None) -> Dict[str, Any]:
+        """공격 강화 분석 요청 처리"""
+        vector = await self._embed_summary(request)
+        return await self._handle_with_vector(request, thread_id, vector)
+
+    async def _handle_with_vector(
+        self, request: Dict[str, Any], thread_id: Optional[str], vector: Optional[List[float]]
+    ) -> Dict[str, Any]:
+        """
+        임베딩이 준비된 요청을 캐시 조회 후 실행
+
+        캐시는 대화 요약 임베딩으로 찾고, 요약 외 입력(판정, 기법 수 등)과 모델이
+        같을 때만 재사용한다. 저장/반환 모두 복사본이라 호출자가 고쳐도 캐시는 그대로.
+        """
+        fingerprint = self._request_fingerprint(request)
+        if vector is not None:
+            cached = _RESULT_CACHE.get(vector)
+            if cached is not None and cached[0] == fingerprint:
+                return copy.deepcopy(cached[1])
+
+        result = await self._run(request, thread_id)
+        if vector is not None and result.get("status") == "success":
+            _RESULT_CACHE.put(vector, (fingerprint, copy.deepcopy(result)))
+        return result
+
+    def _request_fingerprint(self, request: Dict[str, Any]) -> str:
+        """대화 요약을 뺀 나머지 입력 + 모델의 해시"""
+        rest = {k: v for k, v in request.items() if k != "conversation_summary"}
+        payload = orjson.dumps(
+            [self.model_name, rest], option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str
+        )
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    async def ahandle_batch(
+        self, requests: List[Dict[str, Any]], thread_ids: Optional[List[Optional[str]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        여러 요청을 동시에 처리 (입력 순서대로 결과 반환)
+
+        캐시 조회용 임베딩은 한 번의 배치 호출로 계산하고,
+        그래프 실행 동시 수는 SETTINGS.agent_concurrency로 제한한다.
+        """
+        limit = getattr(SETTINGS, "agent_concurrency", 8) if SETTINGS is not None else 8
+        sem = asyncio.Semaphore(max(1, limit))
+        if thread_ids is None:
+            thread_ids = [None] * len(requests)
+        vectors = await self._embed_summaries(requests)
         
-        msgs = out_state.get("messages") or []
-        if msgs:
-            last = msgs[-1]
-            content = getattr(last, "content", None)
-            
-            if isinstance(content, str):
+        async def _one(request: Dict[str, Any], thread_id: Optional[str], vector) -> Dict[str, Any]:
+            async with sem:
                 try:
-                    if "```json" in content:
-                        content = content.split("```json")[1].split("```")[0]
-                    elif "```" in content:
-                        content = content.split("```")[1].split("```")[0]
-                    
-                    result = json.loads(content.strip())
-                    return result
+                    return await self._handle_with_vector(request, thread_id, vector)
                 except Exception as e:
-                    return {
-                        "status": "error",
-                        "message": f"Parse failed: {str(e)}",
-                        "raw": content
-                    }
+                    return {"status": "error", "message": str(e)}
         
-        return {"status": "error", "message": "No response"}
+        return await asyncio.gather(*(_one(*args) for args in zip(requests, thread_ids, vectors)))
 
+    async def _run(self, request: Dict[str, Any], thread_id: Optional[str] = None) -> Dict[str, Any]:
+        """그래프 실행 후 마지막 메시지를 JSON으로 파싱"""
+        inputs, config = self._build_run(request, thread_id)
+        
+        out_state = await self.app.ainvoke(inputs, config=config)
+        return _parse_last_message(out_state)
 
-def build_attack_enhancement_orchestrator(model_name: Optional[str] = None) -> AttackEnhancementOrchestrator:
-    embeddings = OpenAIEmbeddings()
-    vectordb = get_chroma(embeddings)
+
+async def _try_parse(content: str) -> Any:
+    """JSON이면 파싱 결과, 아니면 원문 문자열 (큰 응답은 스레드에서 파싱)"""
+    try:
+        return await aparse_llm_json(content)
+    except ValueError:
+        return content
+
+
+def _parse_last_message(out_state: Dict[str, Any]) -> Dict[str, Any]:
+    """그래프 최종 상태의 마지막 메시지를 JSON 결과로 변환"""
+    msgs = out_state.get("messages") or []
+    if msgs:
+        last = msgs[-1]
+        content = getattr(last, "content", None)
+        
+        if isinstance(content, str):
+            try:
+                return parse_llm_json(content)
+            except Exception as e:
+                return {
+                    "status": "error",
+                    "message": f"Parse failed: {str(e)}",
+                    "raw": content
+                }
     
+    return {"status": "error", "message": "No response"}
+
+
+def _warmup(vectordb) -> None:
+    """
+    첫 요청 전에 미리 한 번 검색
+    - 임베딩 클라이언트 TLS 연결 수립
+    - Chroma 인덱스 로드
+    """
+    try:
+        vectordb.similarity_search("warmup", k=1)
+    except Exception as e:
+        logger.warning("Warmup failed: %s", e)
+
+
+# 모델별로 한 번만 빌드 (그래프 컴파일/워밍업 중복 방지)
+# 조회는 잠금 없이, 없을 때만 잠그고 다시 확인 (double-checked locking)
+_ORCHESTRATORS: Dict[Optional[str], AttackEnhancementOrchestrator] = {}
+_BUILD_LOCK = threading.Lock()
+
+
+def build_attack_enhancement_orchestrator(model_name: Optional[str] = None) -> AttackEnhancementOrchestrator:
+    """모델별 오케스트레이터 (임베딩/벡터DB/그래프를 프로세스 전역에서 재사용)"""
     if model_name is None and SETTINGS is not None:
         model_name = getattr(SETTINGS, "model_name", None)
     
+    orchestrator = _ORCHESTRATORS.get(model_name)
+    if orchestrator is not None:
+        return orchestrator
+    
+    with _BUILD_LOCK:
+        orchestrator = _ORCHESTRATORS.get(model_name)
+        if orchestrator is None:
+            orchestrator = _build_orchestrator(model_name)
+            _ORCHESTRATORS[model_name] = orchestrator
+    return orchestrator
+
+
+def clear_orchestrator_cache() -> None:
+    """캐시된 오케스트레이터와 컴파일된 그래프 제거 (테스트/설정 변경용)"""
+    with _BUILD_LOCK:
+        _ORCHESTRATORS.clear()
+        build_attack_enhancement_agent_graph.cache_clear()
+
+
+def _build_orchestrator(model_name: Optional[str]) -> AttackEnhancementOrchestrator:
+    embeddings = get_embeddings()
+    vectordb = get_chroma_cached()
+    
     app = build_attack_enhancement_agent_graph(vectordb=vectordb, model_name=model_name)
-    return AttackEnhancementOrchestrator(app)
\ No newline at end of file
+    
+    if SETTINGS is not None and getattr(SETTINGS, "app_warmup", False):
+        threading.Thread(target=_warmup, args=(vectordb,), daemon=True).start()
+    
+    return AttackEnhancementOrchestrator(app, embeddings=embeddings, model_name=model_name)
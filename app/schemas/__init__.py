@@ -7,9 +7,14 @@ Pydantic 스키마 정의
 from __future__ import annotations
 
 from typing import Any, Dict, List, Optional, Union
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, computed_field
+
+
+def _utc_now() -> datetime:
+    """현재 UTC 시각 (aware, datetime.utcnow 대체)"""
+    return datetime.now(timezone.utc)
 
 
 class AnalysisType(str, Enum):
@@ -55,7 +60,7 @@ class AnalysisRequest(BaseModel):
     # 선택: 검색 설정
     search_config: Optional[Dict[str, Any]] = Field(
         default=None,
-        description="웹 검색 설정 (max_results, search_depth 등)"
+        description="웹 검색 설정 (max_results, search_depth, request_timeout 등)"
     )
 
     # 선택: 출력 설정
@@ -64,8 +69,11 @@ class AnalysisRequest(BaseModel):
         description="출력 형식 설정"
     )
 
-    class Config:
-        json_schema_extra = {
+    # 입력 모델: 알 수 없는 필드는 무시, 요청 처리 중 변경 불가
+    model_config = ConfigDict(
+        extra="ignore",
+        frozen=True,
+        json_schema_extra={
             "examples": [
                 {
                     "data": "피해자는 30대 직장인 남성이다. 검찰을 사칭한 전화를 받았고...",
@@ -85,7 +93,8 @@ class AnalysisRequest(BaseModel):
                     "analysis_type": "conversation"
                 }
             ]
-        }
+        },
+    )
 
 
 # ==================== 내부 처리용 스키마 ====================
@@ -118,6 +127,9 @@ class SearchResult(BaseModel):
     content_type: str = "snippet"  # snippet, full_crawled
     relevance_score: Optional[float] = None
 
+    # 생성 후 변경하지 않음 (WebSearcher가 검증 없이 model_construct로 생성)
+    model_config = ConfigDict(frozen=True)
+
 
 class GeneratedTechnique(BaseModel):
     """생성된 기법"""
@@ -125,9 +137,16 @@ class GeneratedTechnique(BaseModel):
     description: str
     application: str
     expected_effect: str
-    fit_score: float = Field(ge=0.0, le=1.0)
+    # 0~100 정수 (비교/정렬용). LLM의 0.0~1.0 값은 수집 시점(_to_technique)에 한 번만 변환
+    fit_score: int = Field(ge=0, le=100, strict=True)
     source_info: Optional[List[str]] = None
 
+    @computed_field
+    @property
+    def fit_score_ratio(self) -> float:
+        """응답용 0.0~1.0 값"""
+        return self.fit_score / 100
+
 
 # ==================== 출력 스키마 ====================
 
@@ -160,7 +179,7 @@ class AnalysisResponse(BaseModel):
     error: Optional[str] = None
 
     # 타임스탬프
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utc_now)
 
 
 class HealthResponse(BaseModel):
@@ -205,25 +224,31 @@ class JudgementRequest(BaseModel):
         description="전송 출처"
     )
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "case_id": "550e8400-e29b-41d4-a716-446655440000",
-                "round_no": 1,
-                "turns": [
-                    {"role": "offender", "text": "안녕하세요, 검찰청입니다.", "turn_index": 0},
-                    {"role": "victim", "text": "네, 안녕하세요.", "turn_index": 1}
-                ],
-                "judgement": {
-                    "phishing": False,
-                    "evidence": "피해자가 의심하고 있음",
-                    "risk": {"score": 25, "level": "low", "rationale": "..."},
-                    "victim_vulnerabilities": ["권위에 약함"]
-                },
-                "scenario": {"type": "검찰사칭"},
-                "victim_profile": {"age_group": "60대"}
-            }
-        }
+    # 입력 모델: 알 수 없는 필드는 무시, 요청 처리 중 변경 불가
+    model_config = ConfigDict(
+        extra="ignore",
+        frozen=True,
+        json_schema_extra={
+            "examples": [
+                {
+                    "case_id": "550e8400-e29b-41d4-a716-446655440000",
+                    "round_no": 1,
+                    "turns": [
+                        {"role": "offender", "text": "안녕하세요, 검찰청입니다.", "turn_index": 0},
+                        {"role": "victim", "text": "네, 안녕하세요.", "turn_index": 1}
+                    ],
+                    "judgement": {
+                        "phishing": False,
+                        "evidence": "피해자가 의심하고 있음",
+                        "risk": {"score": 25, "level": "low", "rationale": "..."},
+                        "victim_vulnerabilities": ["권위에 약함"]
+                    },
+                    "scenario": {"type": "검찰사칭"},
+                    "victim_profile": {"age_group": "60대"}
+                }
+            ]
+        },
+    )
 
 
 class JudgementResponse(BaseModel):
@@ -238,7 +263,7 @@ class JudgementResponse(BaseModel):
         default=False,
         description="분석 트리거 여부"
     )
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=_utc_now)
 
 
 class ConversationRequest(BaseModel):
@@ -254,6 +279,9 @@ class ConversationRequest(BaseModel):
     judgement: Optional[Dict[str, Any]] = Field(default=None)
     timestamp: Optional[str] = Field(default=None)
 
+    # 입력 모델: 알 수 없는 필드는 무시, 요청 처리 중 변경 불가
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
 
 class ConversationResponse(BaseModel):
     """대화 수신 응답"""
@@ -270,6 +298,9 @@ class MethodReportRequest(BaseModel):
     conversation_summary: Optional[str] = Field(default=None)
     request_time: Optional[str] = Field(default=None)
 
+    # 입력 모델: 알 수 없는 필드는 무시, 요청 처리 중 변경 불가
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
 
 class MethodReportResponse(BaseModel):
     """수법 리포트 응답"""
@@ -278,7 +309,7 @@ class MethodReportResponse(BaseModel):
     sources: List[str] = Field(default_factory=list)
     summary: str = ""
     recommendations: List[str] = Field(default_factory=list)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utc_now)
 
 
 # Export
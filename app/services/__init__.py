@@ -1,5 +1,5 @@
 # app/services/__init__.py
-from .analyzer import DataAnalyzer
-from .searcher import WebSearcher
+from .analyzer import DataAnalyzer, get_analyzer
+from .searcher import WebSearcher, get_searcher
 
-__all__ = ["DataAnalyzer", "WebSearcher"]
+__all__ = ["DataAnalyzer", "WebSearcher", "get_analyzer", "get_searcher"]
@@ -6,11 +6,23 @@
 """
 from __future__ import annotations
 
-import json
+import asyncio
+import hashlib
 import logging
-from typing import Any, Dict, List, Optional, Union
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from langchain_openai import ChatOpenAI
+from openai import OpenAI
+
+# 선택: LLM 응답 디스크 캐시 (SETTINGS.llm_cache_dir 설정 시)
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
 
 from app.schemas import (
     AnalysisType,
@@ -18,9 +30,93 @@ from app.schemas import (
     AnalysisSummary,
 )
 from app.config import SETTINGS
+from app.llm import get_http_client
+from app.utils import parse_llm_json
+from app.utils.fastjson import dumps, loads
 
 logger = logging.getLogger(__name__)
 
+# 분석 유형 감지 키워드 (앞쪽 유형이 우선)
+_TYPE_KEYWORDS = (
+    (AnalysisType.CONVERSATION, ("대화", "전화", "통화", "말했", "대답", "여보세요")),
+    (AnalysisType.PROFILE, ("나이", "직업", "성별", "연령", "age", "occupation")),
+    (AnalysisType.SCENARIO, ("시나리오", "수법", "사칭", "scenario")),
+)
+_TYPE_PRIORITY = tuple(t for t, _ in _TYPE_KEYWORDS)
+
+# 폴백 쿼리: 키워드 그룹 → 추가할 검색어
+_FALLBACK_QUERIES = (
+    (("30대", "삼십대"), ("30대 심리 특성", "밀레니얼 세대 가치관")),
+    (("60대", "육십대", "노인"), ("고령층 심리", "노년기 불안")),
+    (("직장인",), ("직장인 스트레스", "회사원 고민")),
+    (("퇴직",), ("퇴직자 심리", "은퇴 후 불안")),
+)
+
+# dict 입력에서 본문으로 먼저 꺼낼 필드 (순서 유지용 튜플 + 조회용 frozenset)
+_TEXT_FIELDS = (
+    "text", "content", "message", "summary",
+    "conversation", "transcript", "description",
+    "conversation_summary", "call_transcript",
+)
+_TEXT_FIELD_SET = frozenset(_TEXT_FIELDS)
+
+
+def _keyword_group_re(groups) -> "re.Pattern[str]":
+    """(그룹명, 키워드들) → 한 번의 스캔으로 어느 그룹이 나오는지 찾는 정규식"""
+    return re.compile(
+        "|".join(f"(?P<{name}>{'|'.join(map(re.escape, kws))})" for name, kws in groups),
+        re.IGNORECASE,
+    )
+
+
+# 텍스트 전체를 소문자로 복사하고 유형별로 여러 번 훑는 대신 한 번만 스캔
+_TYPE_KEYWORD_RE = _keyword_group_re((t.name, kws) for t, kws in _TYPE_KEYWORDS)
+_FALLBACK_KEYWORD_RE = _keyword_group_re((f"g{i}", kws) for i, (kws, _) in enumerate(_FALLBACK_QUERIES))
+
+# LLM 응답 캐시: (모델, 프롬프트) 해시 → 응답 문자열 (프로세스 내 LRU + 선택적 디스크)
+_LLM_CACHE_MAX = 512
+_llm_cache: "OrderedDict[str, str]" = OrderedDict()
+_llm_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _llm_disk_cache():
+    if diskcache is None or not SETTINGS.llm_cache_dir:
+        return None
+    return diskcache.Cache(SETTINGS.llm_cache_dir)
+
+
+def _llm_cache_get(key: str) -> Optional[str]:
+    if SETTINGS.llm_cache_disabled:
+        return None
+    with _llm_cache_lock:
+        response = _llm_cache.get(key)
+        if response is not None:
+            _llm_cache.move_to_end(key)
+            return response
+    disk = _llm_disk_cache()
+    response = disk.get(key) if disk is not None else None
+    if response is not None:
+        _llm_cache_mem_put(key, response)
+    return response
+
+
+def _llm_cache_put(key: str, response: str) -> None:
+    if SETTINGS.llm_cache_disabled:
+        return
+    _llm_cache_mem_put(key, response)
+    disk = _llm_disk_cache()
+    if disk is not None:
+        disk.set(key, response)
+
+
+def _llm_cache_mem_put(key: str, response: str) -> None:
+    with _llm_cache_lock:
+        _llm_cache[key] = response
+        _llm_cache.move_to_end(key)
+        while len(_llm_cache) > _LLM_CACHE_MAX:
+            _llm_cache.popitem(last=False)
+
 
 class DataAnalyzer:
     """
@@ -38,6 +134,25 @@ class DataAnalyzer:
             max_retries=2,
         )
 
+    def _llm_cache_key(self, prompt: str) -> str:
+        return hashlib.blake2b(f"{self.model_name}::{prompt}".encode("utf-8"), digest_size=16).hexdigest()
+
+    def _invoke_cached(self, prompt: str) -> Tuple[str, str]:
+        """(캐시 키, 응답) - 캐시 저장은 파싱 성공 후 호출자가 한다"""
+        key = self._llm_cache_key(prompt)
+        response = _llm_cache_get(key)
+        if response is None:
+            response = self.llm.invoke(prompt).content.strip()
+        return key, response
+
+    async def _ainvoke_cached(self, prompt: str) -> Tuple[str, str]:
+        """_invoke_cached의 async 버전"""
+        key = self._llm_cache_key(prompt)
+        response = _llm_cache_get(key)
+        if response is None:
+            response = (await self.llm.ainvoke(prompt)).content.strip()
+        return key, response
+
     def analyze(
         self,
         data: Union[str, Dict[str, Any], List[Any]],
@@ -71,6 +186,48 @@ class DataAnalyzer:
 
         return analysis_result
 
+    async def analyze_async(
+        self,
+        data: Union[str, Dict[str, Any], List[Any]],
+        analysis_type: Optional[AnalysisType] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> AnalysisSummary:
+        """analyze의 async 버전 (LLM 호출 중 이벤트 루프를 막지 않음)"""
+        normalized_text = self._normalize_data(data)
+
+        if analysis_type is None:
+            analysis_type = self._detect_analysis_type(normalized_text)
+
+        return await self._perform_analysis_async(
+            text=normalized_text,
+            analysis_type=analysis_type,
+            context=context or {},
+        )
+
+    async def analyze_batch(
+        self,
+        items: List[Dict[str, Any]],
+        max_concurrency: Optional[int] = None,
+    ) -> List[AnalysisSummary]:
+        """
+        여러 데이터를 동시에 분석 (입력 순서대로 결과 반환)
+
+        Args:
+            items: {"data", "analysis_type", "context"} 딕셔너리 리스트
+            max_concurrency: 동시 LLM 호출 수 (기본 SETTINGS.agent_concurrency)
+        """
+        sem = asyncio.Semaphore(max(1, max_concurrency or SETTINGS.agent_concurrency))
+
+        async def _one(item: Dict[str, Any]) -> AnalysisSummary:
+            async with sem:
+                return await self.analyze_async(
+                    data=item.get("data", ""),
+                    analysis_type=item.get("analysis_type"),
+                    context=item.get("context"),
+                )
+
+        return await asyncio.gather(*(_one(item) for item in items))
+
     def _normalize_data(self, data: Union[str, Dict[str, Any], List[Any]]) -> str:
         """데이터를 분석 가능한 텍스트로 정규화"""
         if isinstance(data, str):
@@ -81,25 +238,19 @@ class DataAnalyzer:
             text_parts = []
 
             # 일반적인 텍스트 필드들
-            text_fields = [
-                "text", "content", "message", "summary",
-                "conversation", "transcript", "description",
-                "conversation_summary", "call_transcript",
-            ]
-
-            for field in text_fields:
+            for field in _TEXT_FIELDS:
                 if field in data and data[field]:
                     text_parts.append(f"[{field}]\n{data[field]}")
 
             # 나머지 필드들
             for key, value in data.items():
-                if key not in text_fields and value:
+                if key not in _TEXT_FIELD_SET and value:
                     if isinstance(value, (str, int, float)):
                         text_parts.append(f"[{key}]: {value}")
                     elif isinstance(value, list):
                         text_parts.append(f"[{key}]: {', '.join(map(str, value))}")
 
-            return "\n\n".join(text_parts) if text_parts else json.dumps(data, ensure_ascii=False)
+            return "\n\n".join(text_parts) if text_parts else dumps(data)
 
         if isinstance(data, list):
             # 리스트의 각 항목을 텍스트로
@@ -108,7 +259,7 @@ class DataAnalyzer:
                 if isinstance(item, str):
                     parts.append(f"[{i}] {item}")
                 elif isinstance(item, dict):
-                    parts.append(f"[{i}] {json.dumps(item, ensure_ascii=False)}")
+                    parts.append(f"[{i}] {dumps(item)}")
                 else:
                     parts.append(f"[{i}] {str(item)}")
             return "\n".join(parts)
@@ -116,21 +267,17 @@ class DataAnalyzer:
         return str(data)
 
     def _detect_analysis_type(self, text: str) -> AnalysisType:
-        """텍스트 내용을 기반으로 분석 유형 감지"""
-        text_lower = text.lower()
-
-        # 키워드 기반 감지
-        conversation_keywords = ["대화", "전화", "통화", "말했", "대답", "여보세요"]
-        profile_keywords = ["나이", "직업", "성별", "연령", "age", "occupation"]
-        scenario_keywords = ["시나리오", "수법", "사칭", "scenario"]
-
-        if any(kw in text_lower for kw in conversation_keywords):
-            return AnalysisType.CONVERSATION
-        if any(kw in text_lower for kw in profile_keywords):
-            return AnalysisType.PROFILE
-        if any(kw in text_lower for kw in scenario_keywords):
-            return AnalysisType.SCENARIO
-
+        """텍스트 내용을 기반으로 분석 유형 감지 (우선순위: 대화 > 프로필 > 시나리오)"""
+        found = set()
+        for match in _TYPE_KEYWORD_RE.finditer(text):
+            analysis_type = AnalysisType[match.lastgroup]
+            if analysis_type is _TYPE_PRIORITY[0]:
+                return analysis_type
+            found.add(analysis_type)
+
+        for analysis_type in _TYPE_PRIORITY:
+            if analysis_type in found:
+                return analysis_type
         return AnalysisType.CUSTOM
 
     def _perform_analysis(
@@ -140,9 +287,123 @@ class DataAnalyzer:
         context: Dict[str, Any],
     ) -> AnalysisSummary:
         """LLM을 사용하여 분석 수행"""
-        context_str = json.dumps(context, ensure_ascii=False) if context else "없음"
+        prompt = self._build_analysis_prompt(text, analysis_type, context)
 
-        prompt = f"""
+        try:
+            key, response = self._invoke_cached(prompt)
+            result = self._parse_analysis(response)
+            _llm_cache_put(key, response)
+            return result
+        except Exception as e:
+            logger.error("Analysis failed: %s", e)
+            return self._fallback_analysis(text)
+
+    async def _perform_analysis_async(
+        self,
+        text: str,
+        analysis_type: AnalysisType,
+        context: Dict[str, Any],
+    ) -> AnalysisSummary:
+        """_perform_analysis의 async 버전"""
+        prompt = self._build_analysis_prompt(text, analysis_type, context)
+
+        try:
+            key, response = await self._ainvoke_cached(prompt)
+            result = self._parse_analysis(response)
+            _llm_cache_put(key, response)
+            return result
+        except Exception as e:
+            logger.error("Analysis failed: %s", e)
+            return self._fallback_analysis(text)
+
+    # ==================== OpenAI Batch API (비대화형 일괄 분석) ====================
+    # 즉시 응답이 필요 없는 재처리/야간 작업용: 요금 절반, 요청 수 제한 대신 배치 창(24h) 안에서 처리
+
+    def _batch_client(self) -> OpenAI:
+        """Batch API용 OpenAI 클라이언트 (LLM과 같은 커넥션 풀 사용)"""
+        return OpenAI(api_key=SETTINGS.openai_api_key or None, http_client=get_http_client())
+
+    def submit_batch(self, items: List[Dict[str, Any]]) -> str:
+        """
+        분석 요청들을 Batch API 작업으로 제출
+
+        Args:
+            items: {"data", "analysis_type", "context", "custom_id"(선택)} 딕셔너리 리스트.
+                custom_id가 없으면 리스트 인덱스를 사용
+
+        Returns:
+            batch_id (poll_batch / fetch_batch_results에 사용)
+        """
+        lines = []
+        for i, item in enumerate(items):
+            text = self._normalize_data(item.get("data", ""))
+            analysis_type = item.get("analysis_type") or self._detect_analysis_type(text)
+            prompt = self._build_analysis_prompt(
+                text, AnalysisType(analysis_type), item.get("context") or {}
+            )
+            lines.append(dumps({
+                "custom_id": str(item.get("custom_id", i)),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model_name,
+                    "temperature": 0.3,
+                    "messages": [{"role": "user", "content": prompt}],
+                },
+            }))
+
+        client = self._batch_client()
+        input_file = client.files.create(
+            file=("analysis_batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch",
+        )
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        logger.info("Submitted analysis batch %s (%s items)", batch.id, len(lines))
+        return batch.id
+
+    def poll_batch(self, batch_id: str) -> str:
+        """배치 작업 상태 (validating, in_progress, completed, failed, expired, ...)"""
+        return self._batch_client().batches.retrieve(batch_id).status
+
+    def fetch_batch_results(self, batch_id: str) -> Dict[str, AnalysisSummary]:
+        """
+        완료된 배치의 결과를 custom_id별 AnalysisSummary로 변환
+
+        실패했거나 파싱할 수 없는 항목은 로그만 남기고 결과에서 제외한다.
+        """
+        client = self._batch_client()
+        batch = client.batches.retrieve(batch_id)
+        if batch.status != "completed" or not batch.output_file_id:
+            raise RuntimeError(f"Batch {batch_id} is not completed (status={batch.status})")
+
+        results: Dict[str, AnalysisSummary] = {}
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = loads(line)
+            custom_id = record.get("custom_id")
+            try:
+                body = record["response"]["body"]
+                content = body["choices"][0]["message"]["content"]
+                results[custom_id] = self._parse_analysis(content.strip())
+            except Exception as e:
+                logger.error("Batch item %s failed: %s", custom_id, record.get("error") or e)
+        return results
+
+    def _build_analysis_prompt(
+        self,
+        text: str,
+        analysis_type: AnalysisType,
+        context: Dict[str, Any],
+    ) -> str:
+        """분석 프롬프트 구성"""
+        context_str = dumps(context) if context else "없음"
+
+        return f"""
 당신은 보이스피싱 시뮬레이션 시스템의 데이터 분석 전문가입니다.
 대화 내용을 깊이 분석하여 피해자의 취약점을 파악하고, 이를 공략할 수 있는 검색 쿼리를 생성하세요.
 
@@ -188,61 +449,46 @@ search_queries 생성 규칙 (중요 - 7:3 비율):
 JSON만 출력 (마크다운 코드블록 없이)
 """.strip()
 
-        try:
-            response = self.llm.invoke(prompt).content.strip()
-
-            # JSON 파싱
-            json_text = self._extract_json(response)
-            result = json.loads(json_text)
-
-            # AnalysisSummary로 변환
-            profile_data = result.get("extracted_profile", {})
-            profile = ExtractedProfile(
-                age_group=profile_data.get("age_group"),
-                occupation=profile_data.get("occupation"),
-                gender=profile_data.get("gender"),
-                characteristics=profile_data.get("characteristics", []),
-            ) if profile_data else None
-
-            return AnalysisSummary(
-                summary=result.get("summary", ""),
-                key_points=result.get("key_points", []),
-                extracted_profile=profile,
-                detected_scenario=result.get("detected_scenario"),
-                vulnerability_areas=result.get("vulnerability_areas", []),
-                search_queries=result.get("search_queries", []),
-            )
-
-        except Exception as e:
-            logger.error(f"Analysis failed: {e}")
-            # 폴백: 기본 분석
-            return AnalysisSummary(
-                summary=text[:200] + "..." if len(text) > 200 else text,
-                key_points=[],
-                search_queries=self._generate_fallback_queries(text),
-            )
+    def _parse_analysis(self, response: str) -> AnalysisSummary:
+        """LLM 응답 → AnalysisSummary (파싱 실패 시 예외)"""
+        # JSON 파싱
+        result = parse_llm_json(response)
+
+        # AnalysisSummary로 변환
+        profile_data = result.get("extracted_profile", {})
+        profile = ExtractedProfile(
+            age_group=profile_data.get("age_group"),
+            occupation=profile_data.get("occupation"),
+            gender=profile_data.get("gender"),
+            characteristics=profile_data.get("characteristics", []),
+        ) if profile_data else None
+
+        return AnalysisSummary(
+            summary=result.get("summary", ""),
+            key_points=result.get("key_points", []),
+            extracted_profile=profile,
+            detected_scenario=result.get("detected_scenario"),
+            vulnerability_areas=result.get("vulnerability_areas", []),
+            search_queries=result.get("search_queries", []),
+        )
 
-    def _extract_json(self, text: str) -> str:
-        """텍스트에서 JSON 추출"""
-        if "```json" in text:
-            return text.split("```json")[1].split("```")[0].strip()
-        if "```" in text:
-            return text.split("```")[1].split("```")[0].strip()
-        return text.strip()
+    def _fallback_analysis(self, text: str) -> AnalysisSummary:
+        """폴백: 기본 분석 (LLM 호출/파싱 실패 시)"""
+        return AnalysisSummary(
+            summary=text[:200] + "..." if len(text) > 200 else text,
+            key_points=[],
+            search_queries=self._generate_fallback_queries(text),
+        )
 
     def _generate_fallback_queries(self, text: str) -> List[str]:
-        """폴백 검색 쿼리 생성"""
-        # 간단한 키워드 추출
-        keywords = []
-        if "30대" in text or "삼십대" in text:
-            keywords.extend(["30대 심리 특성", "밀레니얼 세대 가치관"])
-        if "60대" in text or "육십대" in text or "노인" in text:
-            keywords.extend(["고령층 심리", "노년기 불안"])
-        if "직장인" in text:
-            keywords.extend(["직장인 스트레스", "회사원 고민"])
-        if "퇴직" in text:
-            keywords.extend(["퇴직자 심리", "은퇴 후 불안"])
-
+        """폴백 검색 쿼리 생성 (키워드 그룹 순서대로)"""
+        found = {match.lastgroup for match in _FALLBACK_KEYWORD_RE.finditer(text)}
+        keywords = [
+            query
+            for i, (_, queries) in enumerate(_FALLBACK_QUERIES)
+            if f"g{i}" in found
+            for query in queries
+        ]
         return keywords if keywords else ["심리적 취약점", "신뢰 형성 요인"]
 
     def generate_search_queries(
@@ -279,18 +525,24 @@ JSON만 출력 (마크다운 코드블록 없이)
 """.strip()
 
         try:
-            response = self.llm.invoke(prompt).content.strip()
-            json_text = self._extract_json(response)
-            queries = json.loads(json_text)
+            key, response = self._invoke_cached(prompt)
+            queries = parse_llm_json(response)
 
             if isinstance(queries, list):
+                _llm_cache_put(key, response)
                 return queries[:max_queries]
 
         except Exception as e:
-            logger.error(f"Query generation failed: {e}")
+            logger.error("Query generation failed: %s", e)
 
         # 폴백
         fallback = [f"{question[:10]} 심리", "취약점 요인"]
         if profile and profile.age_group:
             fallback.append(f"{profile.age_group} 특성")
         return fallback
+
+
+@lru_cache(maxsize=4)
+def get_analyzer(model_name: Optional[str] = None) -> DataAnalyzer:
+    """모델별 DataAnalyzer 싱글톤 (요청마다 LLM 클라이언트를 새로 만들지 않음)"""
+    return DataAnalyzer(model_name=model_name)
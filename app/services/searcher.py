@@ -6,14 +6,26 @@
 """
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
 import re
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import httpx
 import requests
 from bs4 import BeautifulSoup
+
+# 선택: C(lexbor) 기반 HTML 파서 (설치돼 있으면 html.parser 대신 사용)
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
 from langchain_tavily import TavilySearch
 
 from app.schemas import SearchResult
@@ -22,6 +34,81 @@ from app.config import SETTINGS
 logger = logging.getLogger(__name__)
 
 
+# ==================== 쿼리 결과 캐시 ====================
+# 비슷한 피해자 프로필에서 같은 쿼리가 반복되므로 Tavily 결과를 잠시 보관
+_QUERY_CACHE_MAX = 1024
+_QUERY_CACHE_TTL = 3600.0
+
+_query_cache: "OrderedDict[Tuple[str, str, int], Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+_query_cache_lock = threading.Lock()
+
+# 본문 지문 계산에 쓰는 앞부분 길이 / 공백 정규화
+_FINGERPRINT_CHARS = 1024
+_WHITESPACE_RE = re.compile(r"\s+")
+# 본문 정리: 연속 빈 줄 → 빈 줄 하나, 연속 공백 → 공백 하나 (한 번에 처리)
+_BLANK_OR_SPACES_RE = re.compile(r"(\n\s*\n)|( {2,})")
+
+
+def _collapse_ws(m: "re.Match[str]") -> str:
+    return "\n\n" if m.group(1) else " "
+
+# 본문 후보 선택자 (앞에서부터 시도, 마지막은 body 폴백)
+_CONTENT_SELECTORS = (
+    "article",
+    "div.content",
+    "div.post-content",
+    "div.article-body",
+    "div.entry-content",
+    "div#content",
+    "main",
+    "div.post_content",
+    "div.article_body",
+    "body",
+)
+# 본문에서 제거할 태그
+_STRIP_TAGS = ("script", "style", "nav", "header", "footer", "aside", "iframe", "noscript")
+
+# 비동기 크롤링 커넥션 풀 (크롤링 배치마다 하나, 같은 호스트의 여러 URL은 keep-alive 연결 재사용)
+_CRAWL_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=30)
+
+
+def _cache_get(key: Tuple[str, str, int]) -> Optional[List[Dict[str, Any]]]:
+    with _query_cache_lock:
+        entry = _query_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, items = entry
+        if time.monotonic() - stored_at > _QUERY_CACHE_TTL:
+            del _query_cache[key]
+            return None
+        _query_cache.move_to_end(key)
+        return items
+
+
+def _cache_put(key: Tuple[str, str, int], items: List[Dict[str, Any]]) -> None:
+    with _query_cache_lock:
+        _query_cache[key] = (time.monotonic(), items)
+        _query_cache.move_to_end(key)
+        while len(_query_cache) > _QUERY_CACHE_MAX:
+            _query_cache.popitem(last=False)
+
+
+def _to_search_result(item: Dict[str, Any], content: str, content_type: str) -> SearchResult:
+    """
+    수집 항목 → SearchResult
+
+    _search_query에서 필드를 이미 str로 정규화했으므로 검증 없이 생성 (결과마다 호출되는 경로)
+    """
+    return SearchResult.model_construct(
+        title=item["title"],
+        url=item["url"],
+        content=content,
+        query=item["query"],
+        content_type=content_type,
+        relevance_score=None,
+    )
+
+
 class WebSearcher:
     """
     웹 검색 서비스
@@ -34,10 +121,13 @@ class WebSearcher:
         max_results_per_query: int = 3,
         search_depth: str = "basic",
         crawl_timeout: int = 10,
+        max_content_length: Optional[int] = None,
     ):
         self.max_results_per_query = max_results_per_query
         self.search_depth = search_depth
         self.crawl_timeout = crawl_timeout
+        # 크롤링 본문은 수집 시점에 잘라 두어 이후 단계가 긴 문자열을 다루지 않게 함
+        self.max_content_length = max_content_length or SETTINGS.max_content_length
 
         self.tavily = TavilySearch(
             max_results=max_results_per_query,
@@ -70,16 +160,44 @@ class WebSearcher:
         """
         # 중복 쿼리 제거
         unique_queries = list(dict.fromkeys(queries))
-        logger.info(f"Searching with {len(unique_queries)} unique queries")
+        logger.info("Searching with %s unique queries", len(unique_queries))
 
         # 1단계: URL 수집
         all_items = self._collect_urls(unique_queries)
 
+        # 2단계: 본문 크롤링 (선택적)
+        unique_items = self._dedupe_items(all_items, max_total_results)
+        return self._to_results(unique_items, extract_content)
+
+    async def asearch(
+        self,
+        queries: List[str],
+        extract_content: bool = True,
+        max_total_results: int = 15,
+        max_concurrency: int = 5,
+    ) -> List[SearchResult]:
+        """
+        search의 async 버전
+        - 쿼리별 Tavily 검색을 ainvoke로 동시에 수행 (max_concurrency로 제한)
+        - 결과 순서는 쿼리 순서 유지, max_total_results개가 모이면 남은 쿼리는 취소
+        - 본문 크롤링은 스레드 풀 대신 배치별 AsyncClient로 동시에 요청
+        """
+        unique_queries = list(dict.fromkeys(queries))
+        logger.info("Searching with %s unique queries", len(unique_queries))
+
+        all_items = await self._acollect_urls(unique_queries, max_concurrency, max_items=max_total_results)
+
+        unique_items = self._dedupe_items(all_items, max_total_results)
+        if extract_content and unique_items:
+            return self._dedupe_contents(await self._acrawl_contents(unique_items))
+        return self._to_results(unique_items, extract_content=False)
+
+    def _dedupe_items(self, all_items: List[Dict[str, Any]], max_total_results: int) -> List[Dict[str, Any]]:
+        """중복 URL 제거 후 최대 개수로 자르기"""
         if not all_items:
             logger.warning("No search results found")
             return []
 
-        # 중복 URL 제거
         seen_urls = set()
         unique_items = []
         for item in all_items:
@@ -88,66 +206,163 @@ class WebSearcher:
                 unique_items.append(item)
 
         unique_items = unique_items[:max_total_results]
-        logger.info(f"Collected {len(unique_items)} unique URLs")
+        logger.info("Collected %s unique URLs", len(unique_items))
+        return unique_items
+
+    def _to_results(self, items: List[Dict[str, Any]], extract_content: bool) -> List[SearchResult]:
+        """수집 항목 → SearchResult (본문 크롤링 또는 스니펫)"""
+        if not items:
+            return []
 
-        # 2단계: 본문 크롤링 (선택적)
         if extract_content:
-            results = self._crawl_contents(unique_items)
-        else:
-            results = [
-                SearchResult(
-                    title=item["title"],
-                    url=item["url"],
-                    content=item["snippet"],
-                    query=item["query"],
-                    content_type="snippet",
-                )
-                for item in unique_items
-            ]
+            return self._dedupe_contents(self._crawl_contents(items))
 
-        return results
+        return self._dedupe_contents([
+            _to_search_result(item, item["snippet"], "snippet")
+            for item in items
+        ])
+
+    @staticmethod
+    def _fingerprint(content: str) -> bytes:
+        """본문 앞부분(공백/대소문자 정규화)의 해시"""
+        normalized = _WHITESPACE_RE.sub(" ", content[:_FINGERPRINT_CHARS]).strip().lower()
+        return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest()
+
+    def _dedupe_contents(self, results: List[SearchResult]) -> List[SearchResult]:
+        """
+        URL은 달라도 본문이 같은 결과(미러/재게시 기사) 제거
+        - 먼저 나온 결과를 유지해 프롬프트에 같은 내용이 두 번 들어가지 않게 함
+        """
+        seen = set()
+        unique = []
+        for r in results:
+            fp = self._fingerprint(r.content or "")
+            if fp in seen:
+                continue
+            seen.add(fp)
+            unique.append(r)
+
+        if len(unique) < len(results):
+            logger.info("Dropped %s duplicate contents", len(results) - len(unique))
+        return unique
 
     def _collect_urls(self, queries: List[str]) -> List[Dict[str, Any]]:
-        """Tavily로 URL 수집"""
-        all_items = []
-
-        for query in queries:
-            try:
-                raw_out = self.tavily.invoke({"query": query})
-                logger.debug(f"Tavily raw output type: {type(raw_out)}, content: {str(raw_out)[:200]}")
-
-                # 결과 정규화
-                results = []
-                if isinstance(raw_out, dict):
-                    results = raw_out.get("results", [])
-                elif isinstance(raw_out, list):
-                    results = raw_out
-                elif isinstance(raw_out, str):
-                    # 문자열인 경우 그대로 사용
-                    logger.info(f"Tavily returned string for '{query}': {raw_out[:200]}")
-                    continue
-
-                for r in results[:self.max_results_per_query]:
-                    # r이 None이거나 dict가 아니면 스킵
-                    if not r or not isinstance(r, dict):
-                        logger.warning(f"Invalid result item: {r}")
+        """Tavily로 URL 수집 (쿼리별 요청을 동시에, 결과는 쿼리 순서대로)"""
+        if len(queries) <= 1:
+            return [item for query in queries for item in self._search_query(query)]
+        with ThreadPoolExecutor(max_workers=min(len(queries), 5)) as executor:
+            nested = list(executor.map(self._search_query, queries))
+        return [item for items in nested for item in items]
+
+    async def _acollect_urls(
+        self,
+        queries: List[str],
+        max_concurrency: int = 5,
+        max_items: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        _collect_urls의 async 버전 (tavily.ainvoke를 동시에, 스레드 사용 안 함)
+
+        max_items개의 고유 URL이 모이면 아직 응답하지 않은 쿼리는 취소한다.
+        결과는 완료된 쿼리들만 쿼리 순서대로 이어 붙인다.
+        """
+        sem = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def _bound(query: str) -> List[Dict[str, Any]]:
+            async with sem:
+                return await self._asearch_query(query)
+
+        tasks = {asyncio.create_task(_bound(q)): i for i, q in enumerate(queries)}
+        nested: List[Optional[List[Dict[str, Any]]]] = [None] * len(queries)
+        seen_urls = set()
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    i = tasks[task]
+                    try:
+                        nested[i] = task.result()
+                    except Exception as e:
+                        logger.error("Search failed for '%s': %s", queries[i], e)
                         continue
+                    seen_urls.update(item["url"] for item in nested[i])
 
-                    url = (r.get("url") or "").strip()
-                    if url:
-                        all_items.append({
-                            "url": url,
-                            "title": (r.get("title") or "")[:150],
-                            "snippet": (r.get("content") or "")[:500],
-                            "query": query,
-                        })
+                if max_items is not None and len(seen_urls) >= max_items:
+                    if pending:
+                        logger.info("Collected %s URLs, skipping %s pending queries", len(seen_urls), len(pending))
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+
+        return [item for items in nested if items for item in items]
 
-                logger.info(f"Query '{query}': {len(results)} results, {len([i for i in all_items if i['query']==query])} valid")
+    def _search_query(self, query: str) -> List[Dict[str, Any]]:
+        """쿼리 1개 검색 (TTL 캐시 적용)"""
+        key = (query, self.search_depth, self.max_results_per_query)
+        cached = _cache_get(key)
+        if cached is not None:
+            return [dict(item) for item in cached]
 
-            except Exception as e:
-                logger.error(f"Search failed for '{query}': {e}", exc_info=True)
+        try:
+            raw_out = self.tavily.invoke({"query": query})
+            return self._store_tavily_items(key, query, raw_out)
+        except Exception as e:
+            logger.error("Search failed for '%s': %s", query, e, exc_info=True)
+            return []
 
-        return all_items
+    async def _asearch_query(self, query: str) -> List[Dict[str, Any]]:
+        """_search_query의 async 버전"""
+        key = (query, self.search_depth, self.max_results_per_query)
+        cached = _cache_get(key)
+        if cached is not None:
+            return [dict(item) for item in cached]
+
+        try:
+            raw_out = await self.tavily.ainvoke({"query": query})
+            return self._store_tavily_items(key, query, raw_out)
+        except Exception as e:
+            logger.error("Search failed for '%s': %s", query, e, exc_info=True)
+            return []
+
+    def _store_tavily_items(
+        self, key: Tuple[str, str, int], query: str, raw_out: Any
+    ) -> List[Dict[str, Any]]:
+        """Tavily 응답 정규화 후 캐시에 저장"""
+        logger.debug("Tavily raw output type: %s, content: %s", type(raw_out), str(raw_out)[:200])
+
+        # 결과 정규화
+        results = []
+        if isinstance(raw_out, dict):
+            results = raw_out.get("results", [])
+        elif isinstance(raw_out, list):
+            results = raw_out
+        elif isinstance(raw_out, str):
+            # 문자열인 경우 그대로 사용
+            logger.info("Tavily returned string for '%s': %s", query, raw_out[:200])
+            return []
+
+        items: List[Dict[str, Any]] = []
+        for r in results[:self.max_results_per_query]:
+            # r이 None이거나 dict가 아니면 스킵
+            if not r or not isinstance(r, dict):
+                logger.warning("Invalid result item: %s", r)
+                continue
+
+            url = (r.get("url") or "").strip()
+            if url:
+                items.append({
+                    "url": url,
+                    "title": (r.get("title") or "")[:150],
+                    "snippet": (r.get("content") or "")[:500],
+                    "query": query,
+                })
+
+        logger.info("Query '%s': %s results, %s valid", query, len(results), len(items))
+
+        _cache_put(key, items)
+        return [dict(item) for item in items]
 
     def _crawl_contents(
         self,
@@ -155,7 +370,7 @@ class WebSearcher:
         max_workers: int = 5,
     ) -> List[SearchResult]:
         """병렬로 본문 크롤링"""
-        logger.info(f"Crawling {len(items)} URLs")
+        logger.info("Crawling %s URLs", len(items))
         results = []
 
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
@@ -170,17 +385,11 @@ class WebSearcher:
                     result = future.result()
                     results.append(result)
                 except Exception as e:
-                    logger.error(f"Crawl failed for {item['url']}: {e}")
+                    logger.error("Crawl failed for %s: %s", item['url'], e)
                     # 폴백: 스니펫 사용
-                    results.append(SearchResult(
-                        title=item["title"],
-                        url=item["url"],
-                        content=item["snippet"],
-                        query=item["query"],
-                        content_type="snippet",
-                    ))
-
-        logger.info(f"Crawling complete: {len(results)} results")
+                    results.append(_to_search_result(item, item["snippet"], "snippet"))
+
+        logger.info("Crawling complete: %s results", len(results))
         return results
 
     def _crawl_single(self, item: Dict[str, Any]) -> SearchResult:
@@ -197,74 +406,110 @@ class WebSearcher:
             if response.encoding is None or response.encoding == "ISO-8859-1":
                 response.encoding = response.apparent_encoding or "utf-8"
 
-            soup = BeautifulSoup(response.text, "html.parser")
-
             # 본문 추출
-            content = self._extract_content(soup)
+            content = self._parse_content(response.text)
 
             if content and len(content) >= 100:
-                return SearchResult(
-                    title=item["title"],
-                    url=item["url"],
-                    content=content[:3000],
-                    query=item["query"],
-                    content_type="full_crawled",
-                )
+                return _to_search_result(item, content[:self.max_content_length], "full_crawled")
 
         except requests.Timeout:
-            logger.warning(f"Timeout: {item['url']}")
+            logger.warning("Timeout: %s", item['url'])
         except Exception as e:
-            logger.warning(f"Crawl error: {e}")
+            logger.warning("Crawl error: %s", e)
 
         # 폴백
-        return SearchResult(
-            title=item["title"],
-            url=item["url"],
-            content=item["snippet"],
-            query=item["query"],
-            content_type="snippet",
-        )
+        return _to_search_result(item, item["snippet"], "snippet")
 
-    def _extract_content(self, soup: BeautifulSoup) -> Optional[str]:
-        """HTML에서 본문 추출"""
-        # 1. 시맨틱 태그 시도
-        content_elem = soup.select_one("article")
+    async def _acrawl_contents(
+        self,
+        items: List[Dict[str, Any]],
+        max_concurrency: int = 10,
+    ) -> List[SearchResult]:
+        """_crawl_contents의 async 버전 (스레드 대신 배치 공용 AsyncClient로 동시 요청, 끝나면 연결 정리)"""
+        logger.info("Crawling %s URLs", len(items))
+        sem = asyncio.Semaphore(max(1, max_concurrency))
+
+        async with httpx.AsyncClient(
+            headers=self.headers,
+            timeout=self.crawl_timeout,
+            follow_redirects=True,
+            limits=_CRAWL_LIMITS,
+        ) as client:
+
+            async def _bound(item: Dict[str, Any]) -> SearchResult:
+                async with sem:
+                    return await self._acrawl_single(client, item)
+
+            results = await asyncio.gather(*(_bound(item) for item in items))
+        logger.info("Crawling complete: %s results", len(results))
+        return list(results)
+
+    async def _acrawl_single(self, client: httpx.AsyncClient, item: Dict[str, Any]) -> SearchResult:
+        """단일 URL 크롤링 (HTML 파싱은 CPU 작업이라 스레드에서)"""
+        try:
+            response = await client.get(item["url"])
+            response.raise_for_status()
 
-        # 2. 일반적인 클래스/ID 시도
-        if not content_elem:
-            selectors = [
-                "div.content",
-                "div.post-content",
-                "div.article-body",
-                "div.entry-content",
-                "div#content",
-                "main",
-                "div.post_content",
-                "div.article_body",
-            ]
-            for selector in selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem:
-                    break
+            # 헤더에 charset이 없으면 바이트를 넘겨 파서가 meta 태그로 인코딩 판별
+            markup = response.text if response.charset_encoding else response.content
+            content = await asyncio.to_thread(self._parse_content, markup)
 
-        # 3. body 폴백
-        if not content_elem:
-            content_elem = soup.select_one("body")
+            if content and len(content) >= 100:
+                return _to_search_result(item, content[:self.max_content_length], "full_crawled")
+
+        except httpx.TimeoutException:
+            logger.warning("Timeout: %s", item['url'])
+        except Exception as e:
+            logger.warning("Crawl error: %s", e)
+
+        # 폴백
+        return _to_search_result(item, item["snippet"], "snippet")
+
+    def _parse_content(self, markup: Union[str, bytes]) -> Optional[str]:
+        """HTML → 본문 텍스트 (selectolax가 설치돼 있으면 lexbor, 없으면 BeautifulSoup)"""
+        if LexborHTMLParser is not None:
+            return self._extract_content_lexbor(LexborHTMLParser(markup))
+        return self._extract_content(BeautifulSoup(markup, "html.parser"))
+
+    def _extract_content_lexbor(self, tree: "LexborHTMLParser") -> Optional[str]:
+        """_extract_content와 같은 규칙을 lexbor 트리에 적용"""
+        # 불필요한 요소 제거 (하위 내용 포함, 본문 후보 선택 전에 트리 전체에서)
+        tree.strip_tags(list(_STRIP_TAGS))
+
+        content_elem = None
+        for selector in _CONTENT_SELECTORS:
+            content_elem = tree.css_first(selector)
+            if content_elem is not None:
+                break
+
+        if content_elem is None:
+            return None
+
+        return self._normalize_whitespace(content_elem.text(separator="\n", strip=True))
+
+    def _extract_content(self, soup: BeautifulSoup) -> Optional[str]:
+        """HTML에서 본문 추출"""
+        # 시맨틱 태그 → 일반적인 클래스/ID → body 순서로 시도
+        content_elem = None
+        for selector in _CONTENT_SELECTORS:
+            content_elem = soup.select_one(selector)
+            if content_elem:
+                break
 
         if not content_elem:
             return None
 
         # 불필요한 요소 제거
-        for tag in content_elem(["script", "style", "nav", "header",
-                                  "footer", "aside", "iframe", "noscript"]):
+        for tag in content_elem(list(_STRIP_TAGS)):
             tag.decompose()
 
         # 텍스트 추출 및 정제
-        content = content_elem.get_text(separator="\n", strip=True)
-        content = re.sub(r"\n\s*\n", "\n\n", content)
-        content = re.sub(r" +", " ", content)
+        return self._normalize_whitespace(content_elem.get_text(separator="\n", strip=True))
 
-        return content
+    @staticmethod
+    def _normalize_whitespace(content: str) -> str:
+        """연속 빈 줄/공백 정리"""
+        return _BLANK_OR_SPACES_RE.sub(_collapse_ws, content)
 
     def search_single_query(
         self,
@@ -277,3 +522,12 @@ class WebSearcher:
             extract_content=extract_content,
             max_total_results=self.max_results_per_query,
         )
+
+
+@lru_cache(maxsize=8)
+def get_searcher(max_results_per_query: int = 3, search_depth: str = "basic") -> WebSearcher:
+    """설정별 WebSearcher 싱글톤 (Tavily 클라이언트 재사용)"""
+    return WebSearcher(
+        max_results_per_query=max_results_per_query,
+        search_depth=search_depth,
+    )
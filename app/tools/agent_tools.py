@@ -1,20 +1,18 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Dict, List, Optional, Tuple
+import random
+import re
+import time
 from datetime import datetime, timezone
+from functools import lru_cache
 from hashlib import sha256
-import random
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urljoin, urlparse, urlunparse
 
 from bs4 import BeautifulSoup
 import requests
-from urllib.parse import urljoin, urlparse
-import re
-from typing import List, Dict, Any, Optional
-import time
-
-from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
 
 from langchain_core.tools import tool
 from langchain_core.documents import Document
@@ -22,7 +20,10 @@ from langchain_chroma import Chroma
 from langchain_openai import ChatOpenAI
 
 from langchain_tavily import TavilySearch, TavilyExtract
+from app.utils import parse_llm_json
+from app.utils.fastjson import dumps, loads
 
+from app.tools.query_cache import invalidate_query_caches
 from app.tools.agent_tools_attack import (
     analyze_conversation_summary,
     generate_search_queries_from_question,
@@ -35,9 +36,26 @@ from app.tools.agent_tools_attack import (
 
 
 def _hash_text(text: str) -> str:
+    # content_hash/문서 ID로 Chroma에 저장되므로 알고리즘을 바꾸면 기존 데이터와 중복 판정이 깨짐
     return sha256(text.encode("utf-8", errors="ignore")).hexdigest()
 
 
+def _stable_json(obj: Any) -> str:
+    """
+    Chroma에 저장/해시되는 JSON 문자열 (표준 json, 기본 구분자)
+
+    문서 ID와 content_hash가 이 문자열로 계산되므로 기존 데이터와 같은 인코딩을 유지한다.
+    fastjson.dumps(orjson, 공백 없는 구분자)는 프롬프트/응답용으로만 쓴다.
+    """
+    return json.dumps(obj, ensure_ascii=False)
+
+
+@lru_cache(maxsize=4)
+def build_tools_by_name(vectordb: Chroma) -> Dict[str, Any]:
+    """도구 이름 → 도구 객체 (build_tools 결과 인덱스)"""
+    return {t.name: t for t in build_tools(vectordb)}
+
+
 def _normalize_tavily_search_output(output: Any) -> List[Dict[str, Any]]:
     """
     TavilySearch.invoke 결과는 보통 dict {'results': [...]} 형태. (버전에 따라 list일 수도 있음)
@@ -54,7 +72,13 @@ def _normalize_tavily_search_output(output: Any) -> List[Dict[str, Any]]:
     return []
 
 
+@lru_cache(maxsize=4)
 def build_tools(vectordb: Chroma) -> List[Any]:
+    """
+    vectordb에 바인딩된 에이전트 도구 목록을 만든다.
+    도구 생성(스키마/클로저)은 비용이 있으므로 vectordb 인스턴스별로 한 번만 만든다.
+    반환된 리스트는 공유되므로 수정하지 말 것.
+    """
     # -----------------------------
     # 1) Vector search (있지만 web-only 그래프에서는 안 씀)
     # -----------------------------
@@ -288,7 +312,7 @@ def build_tools(vectordb: Chroma) -> List[Any]:
         
         victim_context = ""
         if victim_profile:
-            victim_context = f"\n피해자 특성: {json.dumps(victim_profile, ensure_ascii=False)}"
+            victim_context = f"\n피해자 특성: {dumps(victim_profile)}"
         
         prompt = f"""
     너는 보이스피싱 수법 분석 전문가다.
@@ -323,13 +347,7 @@ def build_tools(vectordb: Chroma) -> List[Any]:
         
         # JSON 파싱
         try:
-            # 코드 블록 제거
-            if response.startswith("```"):
-                response = response.split("```")[1]
-                if response.startswith("json"):
-                    response = response[4:]
-            
-            guidance = json.loads(response)
+            guidance = parse_llm_json(response)
             guidance["sources"] = all_sources[:5]
             
             return guidance
@@ -364,7 +382,7 @@ def build_tools(vectordb: Chroma) -> List[Any]:
         now = datetime.now(timezone.utc).isoformat()
         
         # JSON 문자열로 저장
-        content = json.dumps(guidance, ensure_ascii=False)
+        content = _stable_json(guidance)
         guidance_id = _hash_text(content)
         
         doc = Document(
@@ -379,6 +397,7 @@ def build_tools(vectordb: Chroma) -> List[Any]:
         )
         
         vectordb.add_documents([doc])
+        invalidate_query_caches()
         
         return {"stored": 1, "guidance_id": guidance_id}
     
@@ -786,13 +805,7 @@ def build_tools(vectordb: Chroma) -> List[Any]:
             print(f"\n🤖 LLM 응답 미리보기:")
             print(response[:300] + "...")
             
-            # JSON 추출
-            if "```json" in response:
-                response = response.split("```json")[1].split("```")[0]
-            elif "```" in response:
-                response = response.split("```")[1].split("```")[0]
-            
-            guidance_data = json.loads(response)
+            guidance_data = parse_llm_json(response)
 
             # types 검증
             types_list = guidance_data.get("types", [])
@@ -900,28 +913,33 @@ def build_tools(vectordb: Chroma) -> List[Any]:
         """
         now = datetime.now(timezone.utc).isoformat()
         stored_ids = []
+        docs: List[Document] = []
         
         types_list = guidance_data.get("types", [])
+        source_articles_json = _stable_json(source_articles)
         
         for type_info in types_list:
-            content = json.dumps(type_info, ensure_ascii=False)
+            content = _stable_json(type_info)
             guidance_id = _hash_text(content + now)
             
-            doc = Document(
+            docs.append(Document(
                 page_content=content,
                 metadata={
                     "kind": "voicephishing_guidance_crawled_v1",
                     "phishing_type": type_info.get("type", ""),
                     "source_site": site_url,
-                    "source_articles_json": json.dumps(source_articles, ensure_ascii=False),
+                    "source_articles_json": source_articles_json,
                     "created_at": now,
                     "guidance_id": guidance_id,
                 }
-            )
-            
-            vectordb.add_documents([doc])
+            ))
             stored_ids.append(guidance_id)
         
+        # 유형별로 나눠 넣지 않고 한 번에 추가 (임베딩 요청/컬렉션 쓰기 1회)
+        if docs:
+            vectordb.add_documents(docs)
+            invalidate_query_caches()
+        
         return {
             "stored": len(stored_ids),
             "guidance_ids": stored_ids
@@ -1337,7 +1355,7 @@ def build_tools(vectordb: Chroma) -> List[Any]:
         
         victim_ctx = ""
         if victim_profile:
-            victim_ctx = f"\n\n피해자 특성:\n{json.dumps(victim_profile, ensure_ascii=False, indent=2)}"
+            victim_ctx = f"\n\n피해자 특성:\n{dumps(victim_profile, indent=True)}"
         
         prompt = f"""
     너는 보이스피싱 수법 분석 전문가다.
@@ -1399,13 +1417,7 @@ def build_tools(vectordb: Chroma) -> List[Any]:
         try:
             response = llm.invoke(prompt).content.strip()
             
-            # JSON 추출
-            if "```json" in response:
-                response = response.split("```json")[1].split("```")[0]
-            elif "```" in response:
-                response = response.split("```")[1].split("```")[0]
-            
-            guidance = json.loads(response)
+            guidance = parse_llm_json(response)
             
             # 출처 정리
             sources = []
@@ -1539,7 +1551,7 @@ def build_tools(vectordb: Chroma) -> List[Any]:
             if not CACHE_PATH.exists():
                 return []
             try:
-                data = json.loads(CACHE_PATH.read_text(encoding="utf-8"))
+                data = loads(CACHE_PATH.read_text(encoding="utf-8"))
                 if isinstance(data, list):
                     return [str(x) for x in data][-limit:]
             except Exception:
@@ -1549,7 +1561,7 @@ def build_tools(vectordb: Chroma) -> List[Any]:
         def _save_recent_urls(urls: list[str], limit: int = 200) -> None:
             try:
                 CACHE_PATH.write_text(
-                    json.dumps(urls[-limit:], ensure_ascii=False),
+                    dumps(urls[-limit:]),
                     encoding="utf-8",
                 )
             except Exception:
@@ -1746,15 +1758,28 @@ def build_tools(vectordb: Chroma) -> List[Any]:
                 if u and c:
                     extracted_items.append((u, c))
 
-        # (3) 저장 (dedup은 url+hash)
+        # (3) 저장 (dedup은 url+hash, 이미 저장된 content_hash는 임베딩 전에 제외)
+        hashes = [_hash_text(content[:20000]) for _, content in extracted_items]
+        stored_hashes = set()
+        if dedup and hashes:
+            try:
+                existing = vectordb.get(
+                    where={"content_hash": {"$in": list(set(hashes))}},
+                    include=["metadatas"],
+                )
+                stored_hashes = {
+                    (m or {}).get("content_hash") for m in existing.get("metadatas") or []
+                }
+            except Exception:
+                stored_hashes = set()
+
         docs: List[Document] = []
         seen_keys = set()
         skipped = 0
 
-        for u, content in extracted_items:
-            content_hash = _hash_text(content[:20000])
+        for (u, content), content_hash in zip(extracted_items, hashes):
             key = f"{u}::{content_hash}"
-            if dedup and key in seen_keys:
+            if dedup and (key in seen_keys or content_hash in stored_hashes):
                 skipped += 1
                 continue
             seen_keys.add(key)
@@ -1780,7 +1805,9 @@ def build_tools(vectordb: Chroma) -> List[Any]:
             )
 
         if docs:
+            # 한 번에 추가 (임베딩도 배치로 계산)
             vectordb.add_documents(docs)
+            invalidate_query_caches()
 
         stored = len(docs)
         # 추출 실패(0개)일 때도 최소 스니펫 저장 fallback을 하고 싶으면 여기서 추가 가능
@@ -1921,6 +1948,7 @@ def build_tools(vectordb: Chroma) -> List[Any]:
             },
         )
         vectordb.add_documents([doc])
+        invalidate_query_caches()
 
         return {"stored_report": 1, "report_id": report_hash, "kind": "voicephishing_types_v1"}
     
@@ -1962,7 +1990,7 @@ def build_tools(vectordb: Chroma) -> List[Any]:
                 "created_at": now,
                 "snippet_id": snippet_id,
             }
-            page_content = json.dumps(payload, ensure_ascii=False)
+            page_content = _stable_json(payload)
 
             content_hash = _hash_text(url + "|" + content)
 
@@ -1987,6 +2015,7 @@ def build_tools(vectordb: Chroma) -> List[Any]:
 
         if docs:
             vectordb.add_documents(docs)
+            invalidate_query_caches()
 
         return {"stored": stored, "skipped": skipped, "kind": kind}
     
@@ -2082,15 +2111,15 @@ def build_tools(vectordb: Chroma) -> List[Any]:
                 # snippet_id가 없던 구 데이터 대비: url로 만들어줌
                 # (가능하면 수집 단계에서 snippet_id를 항상 넣도록 권장)
                 try:
-                    payload_tmp = json.loads(it.get("payload_json") or "{}")
+                    payload_tmp = loads(it.get("payload_json") or "{}")
                     url_tmp = ((payload_tmp.get("article") or {}).get("url") or it.get("url") or "").strip()
                 except Exception:
                     url_tmp = (it.get("url") or "").strip()
-                sid = _hash_text(url_tmp) if url_tmp else _hash_text(doc_id or json.dumps(it, ensure_ascii=False))
+                sid = _hash_text(url_tmp) if url_tmp else _hash_text(doc_id or _stable_json(it))
             source_snippet_ids.append(sid)
 
             try:
-                payload = json.loads(it.get("payload_json") or "{}")
+                payload = loads(it.get("payload_json") or "{}")
             except Exception:
                 payload = {}
 
@@ -2135,7 +2164,7 @@ def build_tools(vectordb: Chroma) -> List[Any]:
     - 전체 출력은 한국어 텍스트(마크다운 허용), 코드펜스 금지
 
     [입력 스니펫들]
-    {json.dumps(normalized, ensure_ascii=False)}
+    {dumps(normalized)}
     """.strip()
 
         report_text = llm.invoke(prompt).content.strip()
@@ -2151,12 +2180,13 @@ def build_tools(vectordb: Chroma) -> List[Any]:
                 "created_at": now,
                 "report_id": report_id,
                 # Chroma metadata 제약 때문에 JSON 문자열로 저장
-                "source_snippet_ids_json": json.dumps(source_snippet_ids, ensure_ascii=False),
-                "source_doc_ids_json": json.dumps(source_doc_ids, ensure_ascii=False),
+                "source_snippet_ids_json": _stable_json(source_snippet_ids),
+                "source_doc_ids_json": _stable_json(source_doc_ids),
                 "source_count": int(len(source_snippet_ids)),
             },
         )
         vectordb.add_documents([doc])
+        invalidate_query_caches()
 
         return {"stored_report": 1, "report_id": report_id, "source_count": len(source_snippet_ids)}
     
@@ -6,13 +6,14 @@ from bs4 import BeautifulSoup
 import time
 import re
 
-import json
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timezone
 
 from langchain_core.tools import tool
 from langchain_openai import ChatOpenAI
 from langchain_tavily import TavilySearch
+from app.utils import parse_llm_json
+from app.utils.fastjson import dumps
 
 
 @tool("analyze_conversation_summary")
@@ -84,12 +85,7 @@ def analyze_conversation_summary(
     try:
         response = llm.invoke(prompt).content.strip()
         
-        if "```json" in response:
-            response = response.split("```json")[1].split("```")[0]
-        elif "```" in response:
-            response = response.split("```")[1].split("```")[0]
-        
-        result = json.loads(response)
+        result = parse_llm_json(response)
         
         print(f"\n📊 분석 완료:")
         print(f"   - 피해자: {result['victim_profile']['age_group']} {result['victim_profile']['occupation']}")
@@ -131,7 +127,7 @@ def generate_search_queries_from_question(
 너는 검색 쿼리 전문가다.
 
 질문: "{question}"
-피해자 정보: {json.dumps(victim_profile, ensure_ascii=False)}
+피해자 정보: {dumps(victim_profile)}
 
 이 질문에 답하기 위한 웹 검색 쿼리 3-5개를 생성하라.
 
@@ -155,12 +151,7 @@ def generate_search_queries_from_question(
     try:
         response = llm.invoke(prompt).content.strip()
         
-        if "```json" in response:
-            response = response.split("```json")[1].split("```")[0]
-        elif "```" in response:
-            response = response.split("```")[1].split("```")[0]
-        
-        queries = json.loads(response)
+        queries = parse_llm_json(response)
         
         if not isinstance(queries, list):
             queries = [str(queries)]
@@ -519,13 +510,13 @@ def generate_attack_techniques(
 너는 보이스피싱 시나리오 전문가다.
 
 [피해자 정보]
-{json.dumps(victim_profile, ensure_ascii=False, indent=2)}
+{dumps(victim_profile, indent=True)}
 
 [현재 시나리오]
 {current_scenario}
 
 [피해자가 의심한 포인트]
-{json.dumps(victim_suspicion_points, ensure_ascii=False)}
+{dumps(victim_suspicion_points)}
 
 [취약점 정보 ({len(vulnerability_info)}개)]
 {chr(10).join(search_summary)}
@@ -560,18 +551,8 @@ def generate_attack_techniques(
         print(f"   📝 응답 길이: {len(response)}자")
         print(f"   📝 응답 시작: {response[:100]}...")
         
-        # JSON 추출 (여러 패턴 시도)
-        json_text = response
-        
-        if "```json" in response:
-            json_text = response.split("```json")[1].split("```")[0]
-        elif "```" in response:
-            json_text = response.split("```")[1].split("```")[0]
-        
-        json_text = json_text.strip()
-        
-        # JSON 파싱
-        result = json.loads(json_text)
+        # JSON 추출 (코드 펜스 → 순수 JSON → 첫 '{' ~ 마지막 '}') 후 파싱
+        result = parse_llm_json(response)
         techniques = result.get("techniques", [])
         
         if not techniques:
@@ -585,7 +566,7 @@ def generate_attack_techniques(
         
         return techniques
     
-    except json.JSONDecodeError as e:
+    except ValueError as e:
         print(f"   ⚠️ JSON 파싱 실패: {str(e)}")
         print(f"   📄 응답 전체:\n{response[:500]}...")
         return []
@@ -671,13 +652,13 @@ def create_attack_enhancement_report(
 {conversation_summary}
 
 [피해자 프로필]
-{json.dumps(victim_profile, ensure_ascii=False, indent=2)}
+{dumps(victim_profile, indent=True)}
 
 [현재 시나리오]
 {current_scenario}
 
 [선택된 강화 수법 {len(selected_techniques)}개]
-{json.dumps(selected_techniques, ensure_ascii=False, indent=2)}
+{dumps(selected_techniques, indent=True)}
 
 위 정보를 바탕으로 **다음 대화 생성에 활용할 수 있는** 실전 리포트를 작성하라.
 
@@ -711,12 +692,7 @@ def create_attack_enhancement_report(
         print("\n📝 최종 리포트 작성 중...")
         response = llm.invoke(prompt).content.strip()
         
-        if "```json" in response:
-            response = response.split("```json")[1].split("```")[0]
-        elif "```" in response:
-            response = response.split("```")[1].split("```")[0]
-        
-        report = json.loads(response)
+        report = parse_llm_json(response)
         
         now = datetime.now(timezone.utc).isoformat()
         
@@ -0,0 +1,116 @@
+# app/tools/query_cache.py
+"""
+시맨틱 쿼리 캐시
+- 최근 쿼리 벡터(L2 정규화)와 응답을 보관
+- 새 쿼리와 코사인 유사도가 임계값 이상이면 저장된 응답을 재사용
+- 벡터DB 쓰기 시 invalidate_query_caches()로 전체 무효화
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+
+class QueryCache:
+    """(쿼리 벡터, 응답) LRU + TTL 캐시 (스레드 안전)"""
+
+    def __init__(self, max_size: int = 2000, ttl: float = 300.0, threshold: float = 0.97):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.threshold = threshold
+        self._lock = threading.RLock()
+        # key(슬롯 번호) → (저장 시각, 응답)
+        self._entries: "OrderedDict[int, tuple[float, Any]]" = OrderedDict()
+        self._vectors: Optional[np.ndarray] = None  # (max_size, dim) 링 버퍼
+        self._valid = np.zeros(max_size, dtype=bool)
+        self._free: List[int] = []  # 만료로 비워진 슬롯
+        self._next_slot = 0
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm > 0 else v
+
+    def get(self, vector: Sequence[float]) -> Optional[Any]:
+        """가장 유사한 캐시 항목의 응답 (임계값 미만이거나 만료면 None)"""
+        with self._lock:
+            if self._vectors is None or not self._entries:
+                return None
+
+            q = self._normalize(vector)
+            if q.shape[0] != self._vectors.shape[1]:
+                return None
+
+            scores = self._vectors @ q
+            scores[~self._valid] = -1.0
+            slot = int(np.argmax(scores))
+            if scores[slot] < self.threshold:
+                return None
+
+            stored_at, response = self._entries[slot]
+            if time.monotonic() - stored_at > self.ttl:
+                self._evict(slot)
+                return None
+
+            self._entries.move_to_end(slot)
+            return response
+
+    def put(self, vector: Sequence[float], response: Any) -> None:
+        """응답 저장 (가득 차면 가장 오래 안 쓰인 항목 교체)"""
+        with self._lock:
+            v = self._normalize(vector)
+            if self._vectors is None or self._vectors.shape[1] != v.shape[0]:
+                self._vectors = np.zeros((self.max_size, v.shape[0]), dtype=np.float32)
+                self._valid[:] = False
+                self._entries.clear()
+                self._free.clear()
+                self._next_slot = 0
+
+            if self._free:
+                slot = self._free.pop()
+            elif self._next_slot < self.max_size:
+                slot = self._next_slot
+                self._next_slot += 1
+            else:
+                slot, _ = self._entries.popitem(last=False)
+
+            self._vectors[slot] = v
+            self._valid[slot] = True
+            self._entries[slot] = (time.monotonic(), response)
+
+    def _evict(self, slot: int) -> None:
+        if self._entries.pop(slot, None) is not None:
+            self._free.append(slot)
+        self._valid[slot] = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._free.clear()
+            self._valid[:] = False
+            self._next_slot = 0
+
+
+# ==================== 전역 레지스트리 ====================
+_CACHES: List[QueryCache] = []
+_CACHES_LOCK = threading.Lock()
+
+
+def register_query_cache(cache: QueryCache) -> QueryCache:
+    """invalidate_query_caches() 대상에 등록"""
+    with _CACHES_LOCK:
+        _CACHES.append(cache)
+    return cache
+
+
+def invalidate_query_caches() -> None:
+    """벡터DB 내용이 바뀌었으므로 등록된 모든 캐시 비우기"""
+    with _CACHES_LOCK:
+        caches = list(_CACHES)
+    for cache in caches:
+        cache.clear()
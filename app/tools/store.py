@@ -1,6 +1,18 @@
+import threading
+from functools import lru_cache
+from typing import Optional, Tuple
+
 from langchain_chroma import Chroma
 from langchain_core.embeddings import Embeddings
+from langchain_openai import OpenAIEmbeddings
 from app.config import SETTINGS
+from app.llm import get_http_async_client, get_http_client
+
+# local 백엔드 기본 모델 (다국어 → 한글 문서 검색 가능)
+_DEFAULT_LOCAL_MODEL = "BAAI/bge-m3"
+
+# lru_cache는 동시에 처음 호출되면 두 번 생성할 수 있으므로 생성 구간만 잠금
+_build_lock = threading.Lock()
 
 def get_chroma(embeddings: Embeddings) -> Chroma:
     return Chroma(
@@ -8,3 +20,47 @@ def get_chroma(embeddings: Embeddings) -> Chroma:
         persist_directory=SETTINGS.chroma_persist_dir,
         embedding_function=embeddings,
     )
+
+
+@lru_cache(maxsize=4)
+def _embeddings(backend: str, model_id: Optional[str]) -> Embeddings:
+    if backend == "local":
+        # 선택 의존성: langchain-huggingface + sentence-transformers
+        from langchain_huggingface import HuggingFaceEmbeddings
+
+        return HuggingFaceEmbeddings(
+            model_name=model_id or _DEFAULT_LOCAL_MODEL,
+            encode_kwargs={"normalize_embeddings": True},
+        )
+    if backend != "openai":
+        raise ValueError(f"Unknown EMBEDDING_BACKEND: {backend}")
+    # LLM과 같은 keep-alive 풀 사용 (요청 스레드마다 새 연결을 맺지 않음)
+    # 비동기 클라이언트의 연결은 이벤트 루프별로 따로 관리되므로 aembed_*를 어느 루프에서 불러도 안전
+    kwargs = {"http_client": get_http_client(), "http_async_client": get_http_async_client()}
+    return OpenAIEmbeddings(model=model_id, **kwargs) if model_id else OpenAIEmbeddings(**kwargs)
+
+
+@lru_cache(maxsize=4)
+def _chroma(backend: str, model_id: Optional[str]) -> Chroma:
+    return get_chroma(_embeddings(backend, model_id))
+
+
+def _resolve(model_id: Optional[str]) -> Tuple[str, Optional[str]]:
+    return SETTINGS.embedding_backend, model_id or SETTINGS.embedding_model or None
+
+
+def get_embeddings(model_id: Optional[str] = None) -> Embeddings:
+    """
+    임베딩 모델별 프로세스 전역 Embeddings
+
+    SETTINGS.embedding_backend가 local이면 로컬 sentence-transformers 모델,
+    아니면 OpenAIEmbeddings (model_id가 없으면 SETTINGS.embedding_model → 라이브러리 기본값)
+    """
+    with _build_lock:
+        return _embeddings(*_resolve(model_id))
+
+
+def get_chroma_cached(model_id: Optional[str] = None) -> Chroma:
+    """임베딩 모델별 프로세스 전역 Chroma (오케스트레이터끼리 클라이언트/SQLite 연결 공유)"""
+    with _build_lock:
+        return _chroma(*_resolve(model_id))
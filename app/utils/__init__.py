@@ -2,26 +2,77 @@
 """유틸리티 함수"""
 from __future__ import annotations
 
-import json
+import asyncio
 import re
 from typing import Any
 
+import orjson
+
+# 선택: 표준 JSON 파싱이 실패했을 때만 쓰는 관대한 파서 (후행 쉼표, 작은따옴표 등)
+try:
+    import json5
+except ImportError:
+    json5 = None
+
+# ```json ... ``` 또는 ``` ... ``` 코드 펜스 (첫 번째 블록)
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+# 공백 뒤 바로 JSON 객체/배열이 시작하는 응답
+_JSON_START_RE = re.compile(r"\s*[\[{]")
+
+# 이 길이(문자 수) 이상이면 파싱을 스레드로 넘겨 이벤트 루프를 막지 않음
+# (기법 10개 응답은 한글 설명이 길어 16K자를 쉽게 넘음)
+_OFFLOAD_THRESHOLD = 16 * 1024
+
 
 def extract_json(text: str) -> str:
-    """텍스트에서 JSON 부분 추출"""
-    if "```json" in text:
-        return text.split("```json")[1].split("```")[0].strip()
-    if "```" in text:
-        return text.split("```")[1].split("```")[0].strip()
-    return text.strip()
+    """텍스트에서 JSON 부분 추출 (앞뒤 공백은 남길 수 있음 → JSON 파서에 바로 전달)"""
+    match = _FENCE_RE.search(text)
+    if match:
+        return match.group(1)
+
+    # 앞뒤 공백은 JSON 파서가 건너뛰므로 strip()으로 복사하지 않음
+    if _JSON_START_RE.match(text):
+        return text
+
+    # 설명 문장이 섞인 경우: 첫 '{' ~ 마지막 '}'
+    start = text.find("{")
+    end = text.rfind("}")
+    if 0 <= start < end:
+        return text[start:end + 1]
+    return text
+
+
+def parse_llm_json(text: str) -> Any:
+    """
+    LLM 응답에서 JSON 추출 후 파싱
+
+    orjson으로 먼저 파싱하고, 실패했을 때만 json5로 재시도한다.
+    (json5는 훨씬 느리므로 정상 응답 경로에서는 쓰지 않음)
+    """
+    payload = extract_json(text)
+    try:
+        return orjson.loads(payload)
+    except orjson.JSONDecodeError as e:
+        if json5 is None:
+            raise
+        try:
+            return json5.loads(payload)
+        except ValueError:
+            raise e from None
+
+
+async def aparse_llm_json(text: str) -> Any:
+    """parse_llm_json의 async 버전 (큰 응답은 스레드에서 파싱)"""
+    if len(text) >= _OFFLOAD_THRESHOLD:
+        return await asyncio.to_thread(parse_llm_json, text)
+    return parse_llm_json(text)
 
 
 def safe_json_loads(text: str, default: Any = None) -> Any:
     """안전한 JSON 파싱"""
     try:
-        json_text = extract_json(text)
-        return json.loads(json_text)
-    except (json.JSONDecodeError, IndexError):
+        return parse_llm_json(text)
+    except ValueError:
         return default
 
 
@@ -0,0 +1,18 @@
+# app/utils/fastjson.py
+"""
+orjson 기반 JSON 직렬화/파싱
+- json.dumps(..., ensure_ascii=False) / json.loads 대체 (한글은 이스케이프 없이 UTF-8 그대로)
+"""
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+
+loads = orjson.loads
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """객체 → JSON 문자열 (indent=True면 2칸 들여쓰기, 프롬프트 가독성용)"""
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+    return orjson.dumps(obj, option=option).decode()
@@ -10,14 +10,24 @@ VP-Web-Search API Server
 from __future__ import annotations
 
 import logging
+import sys
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import uvicorn
 
-from app.api.routes import router
+from app.agents import build_research_agent
+from app.api import (
+    ORJSONResponse,
+    RequestLoggingMiddleware,
+    router,
+    start_webhook_sender,
+    stop_webhook_sender,
+)
 from app.config import SETTINGS
+from app.llm import close_http_async_pool
 
 # 로깅 설정
 logging.basicConfig(
@@ -31,9 +41,19 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """애플리케이션 라이프사이클"""
     logger.info("Starting VP-Web-Search API...")
-    logger.info(f"Model: {SETTINGS.model_name}")
+    logger.info("Model: %s", SETTINGS.model_name)
+
+    # 에이전트는 시작 시 한 번만 생성 (요청 경로에서 초기화하지 않음)
+    app.state.agent = build_research_agent()
+    await app.state.agent.prewarm()
+    logger.info("Research agent ready")
+
+    await start_webhook_sender()
+
     yield
     logger.info("Shutting down...")
+    await stop_webhook_sender()
+    await close_http_async_pool()
 
 
 # FastAPI 앱 생성
@@ -62,6 +82,7 @@ app = FastAPI(
     """,
     version="2.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS 설정
@@ -73,6 +94,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 응답 압축 (분석 결과/목록 응답은 수 MB까지 커짐, 1KB 미만은 압축 생략)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# 요청 로깅 (순수 ASGI 미들웨어)
+app.add_middleware(RequestLoggingMiddleware)
+
 # 라우터 등록
 app.include_router(router)
 
@@ -86,7 +113,8 @@ async def root():
         "version": "2.0.0",
         "status": "running",
         "endpoints": {
-            "analyze": "POST /api/analyze - 전체 분석",
+            "analyze": "POST /api/analyze - 전체 분석 (?background=true면 202 + job_id)",
+            "analyze_job": "GET /api/analyze/jobs/{job_id} - 백그라운드 분석 결과 조회",
             "quick_analyze": "POST /api/analyze/quick - 빠른 분석",
             "search": "POST /api/search - 웹 검색",
             "health": "GET /health - 헬스 체크",
@@ -111,4 +139,8 @@ if __name__ == "__main__":
         port=8001,
         reload=True,
         log_level="info",
+        # uvloop은 Windows 미지원
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        timeout_keep_alive=30,
     )
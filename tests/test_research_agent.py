@@ -0,0 +1,23 @@
+# tests/test_research_agent.py
+import pytest
+
+from app.agents.research_agent import _fit_score_percent, _to_technique
+
+
+@pytest.mark.parametrize(
+    "raw, percent",
+    [(0, 0), (1, 100), (0.0, 0), (1.0, 100), (0.85, 85), ("0.6", 60)],
+)
+def test_fit_score_percent_converts_ratio(raw, percent):
+    assert _fit_score_percent(raw) == percent
+
+
+@pytest.mark.parametrize("bad", [-0.1, 1.5, 85])
+def test_fit_score_percent_rejects_out_of_range(bad):
+    with pytest.raises(ValueError):
+        _fit_score_percent(bad)
+
+
+def test_to_technique_skips_invalid_fit_score():
+    assert _to_technique({"name": "x", "fit_score": 1.5}) is None
+    assert _to_technique({"name": "x", "fit_score": 1}).fit_score == 100
@@ -0,0 +1,35 @@
+# tests/test_schemas.py
+import pytest
+from pydantic import ValidationError
+
+from app.schemas import GeneratedTechnique
+
+
+def _technique(fit_score):
+    return GeneratedTechnique(
+        name="n",
+        description="d",
+        application="a",
+        expected_effect="e",
+        fit_score=fit_score,
+    )
+
+
+@pytest.mark.parametrize("percent", [0, 1, 60, 100])
+def test_fit_score_keeps_percent_and_exposes_ratio(percent):
+    t = _technique(percent)
+    assert t.fit_score == percent
+    dumped = t.model_dump()
+    assert dumped["fit_score"] == percent
+    assert dumped["fit_score_ratio"] == percent / 100
+
+
+@pytest.mark.parametrize("bad", [-1, 101, 0.85, 1.5, "60"])
+def test_fit_score_rejects_out_of_range_and_non_int(bad):
+    with pytest.raises(ValidationError):
+        _technique(bad)
+
+
+def test_fit_score_roundtrip_ignores_computed_ratio():
+    t = _technique(85)
+    assert GeneratedTechnique.model_validate(t.model_dump()) == t